@@ -114,7 +114,8 @@ def handle_list_token_command(args):
             size_limit_mb=size_limit_mb,
             debug_explain=debug_explain,
             include_size_in_list=False, # We don't need size here
-            exclusion_parser=exclusion_parser # Add exclusion parser support
+            exclusion_parser=exclusion_parser, # Add exclusion parser support
+            skip_binary_check=args.no_binary_check
         )
 
         file_paths_relative = [line.strip() for line in file_list_str.splitlines() if line.strip()]
@@ -326,7 +327,8 @@ def handle_read_command(args):
             size_limit_mb=size_limit_mb,
             debug_explain=debug_explain,
             include_size_in_list=args.size, # Pass the CLI arg value
-            exclusion_parser=exclusion_parser # Add exclusion parser support
+            exclusion_parser=exclusion_parser, # Add exclusion parser support
+            skip_binary_check=args.no_binary_check
         )
 
         # --- Output ---
@@ -483,6 +485,11 @@ Examples:
         action="store_true",
         help="Print detailed explanation for file/directory inclusion/exclusion to stderr."
     )
+    parser.add_argument(
+        "--no-binary-check",
+        action="store_true",
+        help="Treat every included file as text, skipping binary detection. Faster on large trees known to hold only text."
+    )
     parser.add_argument(
         "--no-copy",
         action="store_true",
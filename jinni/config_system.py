@@ -1,7 +1,11 @@
 # jinni/config_system.py
+import os
+import stat
 import logging
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Iterable
+from typing import List, Iterable, Tuple, Dict, Optional, Callable, Any
 
 # Attempt to import pathspec, provide guidance if missing
 try:
@@ -70,27 +74,49 @@ DEFAULT_RULES: List[str] = [
     "!LICENSE",
 ]
 
-def load_rules_from_file(file_path: Path) -> List[str]:
-    """
-    Reads rules (lines) from a given file path.
-    Handles potential file reading errors.
-    Returns an empty list if the file doesn't exist or cannot be read.
-    """
-    if not file_path.is_file():
+# Rule file contents keyed by path, stored with the (st_mtime_ns, st_size) they were
+# read at. Every directory in a walk re-requests its ancestors' rule files, and a
+# long-running server repeats whole walks, so unchanged files are only read once.
+_RULE_FILE_CACHE: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {}
+_RULE_FILE_CACHE_MAX_ENTRIES = 4096
+
+def _read_rule_lines(file_path: Path) -> Tuple[str, ...]:
+    """Returns the cached lines of a rule file, re-reading only when its mtime or size changed."""
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        file_stat = None
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
         logger.debug(f"Rule file not found: {file_path}")
-        return []
+        return ()
+
+    cache_key = os.fspath(file_path)
+    cached = _RULE_FILE_CACHE.get(cache_key)
+    if cached is not None and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+        return cached[2]
     try:
         # Read lines respecting encoding, ignore errors for simplicity now
-        lines = file_path.read_text(encoding='utf-8', errors='ignore').splitlines()
+        lines = tuple(file_path.read_text(encoding='utf-8', errors='ignore').splitlines())
         logger.debug(f"Read {len(lines)} lines from {file_path}")
+        if len(_RULE_FILE_CACHE) >= _RULE_FILE_CACHE_MAX_ENTRIES:
+            _RULE_FILE_CACHE.clear() # Same crude bound as utils._BINARY_CACHE; re-reading rule files is cheap
+        _RULE_FILE_CACHE[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, lines)
         return lines
     except Exception as e:
         logger.warning(f"Could not read rule file {file_path}: {e}")
-        return []
+        return ()
 
-def load_gitignore_as_context_rules(file_path: Path) -> List[str]:
-    """Load .gitignore rules and convert to Jinni-style context rules."""
-    raw_lines = load_rules_from_file(file_path)
+def load_rules_from_file(file_path: Path) -> List[str]:
+    """
+    Reads rules (lines) from a given file path.
+    Handles potential file reading errors.
+    Returns an empty list if the file doesn't exist or cannot be read.
+    Results are cached and reused while the file's mtime and size are unchanged.
+    """
+    return list(_read_rule_lines(file_path))
+
+@lru_cache(maxsize=256)
+def _convert_gitignore_lines(raw_lines: Tuple[str, ...]) -> Tuple[str, ...]:
     converted: List[str] = []
     for line in raw_lines:
         # Preserve leading/trailing spaces (except final newline) to mimic
@@ -105,7 +131,30 @@ def load_gitignore_as_context_rules(file_path: Path) -> List[str]:
         else:
             # Regular gitignore entry is an exclusion -> prefix '!'
             converted.append("!" + line_no_nl)
-    return converted
+    return tuple(converted)
+
+def load_gitignore_as_context_rules(file_path: Path) -> List[str]:
+    """
+    Load .gitignore rules and convert to Jinni-style context rules.
+    The conversion is memoized on the file's lines, since every directory below a
+    .gitignore requests it again.
+    """
+    return list(_convert_gitignore_lines(_read_rule_lines(file_path)))
+
+@lru_cache(maxsize=256)
+def _compile_spec_cached(rules: Tuple[str, ...]) -> pathspec.PathSpec:
+    """
+    Compiles and memoizes a PathSpec for an exact tuple of rule strings.
+    The walker compiles the same rule stack for most directories, and callers
+    such as the MCP server repeat identical rule lists across requests.
+    Returned specs are shared, so callers must treat them as read-only.
+    """
+    valid_lines = [line for line in rules if line.strip() and not line.strip().startswith('#')]
+    spec = pathspec.PathSpec.from_lines('gitwildmatch', valid_lines)
+    if valid_lines:
+        # Store original rules for later use with scoped exclusions
+        spec._original_rules = list(rules)
+    return spec
 
 def compile_spec_from_rules(rules: Iterable[str], source_description: str = "rules list") -> pathspec.PathSpec:
     """
@@ -113,22 +162,113 @@ def compile_spec_from_rules(rules: Iterable[str], source_description: str = "rul
     Uses 'gitwildmatch' syntax.
     Filters out empty lines and comments.
     Returns an empty PathSpec if no valid rules are provided or on error.
+    Compiled specs are cached by rule content, so identical rule lists share one spec.
     """
-    valid_lines = [line for line in rules if line.strip() and not line.strip().startswith('#')]
-    if not valid_lines:
-        logger.debug(f"No valid pattern lines found in {source_description}.")
-        # Return an empty spec instead of None
-        return pathspec.PathSpec.from_lines('gitwildmatch', [])
     try:
-        spec = pathspec.PathSpec.from_lines('gitwildmatch', valid_lines)
-        # Store original rules for later use with scoped exclusions
-        spec._original_rules = list(rules)
-        logger.debug(f"Compiled PathSpec from {source_description} with {len(spec.patterns)} patterns.")
-        return spec
+        spec = _compile_spec_cached(tuple(rules))
     except Exception as e:
         logger.warning(f"Could not compile PathSpec from {source_description}: {e}")
         # Return an empty spec on error
-        return pathspec.PathSpec.from_lines('gitwildmatch', [])
+        return _compile_spec_cached(())
+    if not spec.patterns:
+        logger.debug(f"No valid pattern lines found in {source_description}.")
+    else:
+        logger.debug(f"Compiled PathSpec from {source_description} with {len(spec.patterns)} patterns.")
+    return spec
+
+_DEFAULT_SPEC: Optional[pathspec.PathSpec] = None
+
+def _get_default_spec() -> pathspec.PathSpec:
+    """Returns the compiled spec for DEFAULT_RULES, compiling it on first use."""
+    global _DEFAULT_SPEC
+    if _DEFAULT_SPEC is None:
+        _DEFAULT_SPEC = compile_spec_from_rules(DEFAULT_RULES, "Default Rules")
+    return _DEFAULT_SPEC
+
+# Matches simple extension rules like '*.py' or '!*.log'
+_EXTENSION_RULE_RE = re.compile(r'^(!?)\*\.([A-Za-z0-9_+-]+)$')
+
+@lru_cache(maxsize=256)
+def _extension_prefilter_cached(rules: Tuple[str, ...]) -> Dict[str, bool]:
+    decisions: Dict[str, bool] = {}
+    for line in reversed(rules):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        match = _EXTENSION_RULE_RE.match(line)
+        if not match:
+            break # Any other pattern could match regardless of extension
+        # Scanning backwards, so the first rule seen for an extension is the last one to apply
+        decisions.setdefault(match.group(2), match.group(1) != '!')
+    return decisions
+
+def compile_extension_prefilter(rules: Iterable[str]) -> Dict[str, bool]:
+    """
+    Builds a cheap extension -> included lookup from the trailing '*.ext' / '!*.ext' rules.
+
+    With last-match-wins semantics, if a file's extension appears among the trailing
+    extension rules, the last of those rules decides the match and everything before
+    it is irrelevant. This only holds when no directory component of the matched path
+    contains a '.', since '*.ext' also matches directories. Extensions absent from the
+    lookup must be matched against the full spec.
+    """
+    return _extension_prefilter_cached(tuple(rules))
+
+def _partition_spec_patterns(spec: pathspec.PathSpec) -> Tuple[Tuple[Tuple[int, Any], ...], Tuple[Tuple[int, Any], ...]]:
+    """
+    Splits a spec's active patterns into (directory-level, other) lists of (index, pattern),
+    each in reverse order so the first hit is the last matching rule. Stored on the
+    spec, which is shared through the compile cache.
+
+    Directory-level patterns are directory-only ones ('name/') and those matching
+    everything below a directory ('name/**', whose regex ends at the '/'), such as the
+    ExclusionParser's keyword patterns.
+    """
+    partitioned = getattr(spec, '_partitioned_patterns', None)
+    if partitioned is None:
+        dir_patterns = []
+        other_patterns = []
+        for index, pattern in enumerate(spec.patterns):
+            if pattern.include is None:
+                continue # Comments and blank lines compile to no-op patterns
+            if pattern.pattern.rstrip(' ').endswith('/') or pattern.regex.pattern.endswith('/'):
+                dir_patterns.append((index, pattern))
+            else:
+                other_patterns.append((index, pattern))
+        partitioned = (tuple(reversed(dir_patterns)), tuple(reversed(other_patterns)))
+        spec._partitioned_patterns = partitioned
+    return partitioned
+
+def compile_directory_file_matcher(spec: pathspec.PathSpec, dir_match_prefix: str) -> Callable[[str], bool]:
+    """
+    Returns a function equivalent to spec.match_file for files directly inside one directory.
+
+    A directory-only pattern ('name/') or a 'name/**' pattern matches a file exactly when
+    it matches one of the file's parent directories, so those patterns are checked once
+    here against the directory itself. Files then only run the other patterns that come after the last
+    matching directory pattern, falling back to that pattern's decision.
+
+    Args:
+        spec: The compiled spec in effect for the directory.
+        dir_match_prefix: The directory's match path with a trailing '/', or '' at the root.
+    """
+    dir_patterns, other_patterns = _partition_spec_patterns(spec)
+    dir_index = -1
+    dir_decision = False
+    if dir_match_prefix:
+        for index, pattern in dir_patterns:
+            if pattern.match_file(dir_match_prefix) is not None:
+                dir_index, dir_decision = index, pattern.include
+                break
+    candidates = tuple(pattern for index, pattern in other_patterns if index > dir_index)
+
+    def match_file(file_path: str) -> bool:
+        for pattern in candidates:
+            if pattern.match_file(file_path) is not None:
+                return pattern.include
+        return dir_decision
+
+    return match_file
 
 # --- End of config_system.py ---
 # Obsolete functions (check_item, find_and_compile_contextfile) and types removed.
@@ -3,8 +3,11 @@
 
 import os
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Any, Set
+from typing import List, Tuple, Dict, Optional, Any, Set, Deque
 
 # Attempt to import pathspec
 try:
@@ -17,29 +20,125 @@ from .config_system import (
     load_rules_from_file,
     load_gitignore_as_context_rules,
     compile_spec_from_rules,
+    compile_extension_prefilter,
+    compile_directory_file_matcher,
+    _get_default_spec,
     DEFAULT_RULES,
     CONTEXT_FILENAME,
+    GITIGNORE_FILENAME,
 )
-from .utils import _find_context_files_for_dir, _find_gitignore_files_for_dir
-from .file_processor import process_file
+from .utils import _find_context_files_for_dir, _find_gitignore_files_for_dir, _to_posix_path, _relative_posix_path, _scandir_walk
+from .file_processor import load_file, format_file_output
 from .exceptions import ContextSizeExceededError
 
 # Setup logger for this module
 logger = logging.getLogger("jinni.context_walker")
 
+# File loading is dominated by stat/open/read syscalls which release the GIL,
+# so a thread pool overlaps the I/O of the files within each directory.
+MAX_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directories with no rule files, overrides or scoped exclusions in effect use the defaults alone
+_DEFAULT_EXTENSION_DECISIONS = compile_extension_prefilter(DEFAULT_RULES)
+
+# How many loaded-but-unaccounted files may be queued before the walk waits on them.
+# The bytes they may read are bounded separately, by the budget each load reserves.
+READ_AHEAD_FILES = MAX_READ_WORKERS * 4
+
+# Shared by every walk (the MCP server calls read_context once per request), so
+# worker threads are started once per process rather than once per walk.
+_READ_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_READ_EXECUTOR_LOCK = threading.Lock()
+
+def _get_read_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide file reading pool, creating it on first use."""
+    global _READ_EXECUTOR
+    if _READ_EXECUTOR is None:
+        with _READ_EXECUTOR_LOCK:
+            if _READ_EXECUTOR is None:
+                _READ_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_READ_WORKERS, thread_name_prefix="jinni-read")
+    return _READ_EXECUTOR
+
+def _account_loaded_files(
+    pending_loads: Deque[Tuple[Path, Optional[str], Optional[os.DirEntry], int, Future]],
+    keep: int,
+    output_parts: List[str],
+    processed_files_set: Set[str],
+    total_size_bytes: int,
+    reserved_bytes: int,
+    output_rel_root: Path,
+    size_limit_bytes: int,
+    list_only: bool,
+    include_size_in_list: bool,
+    debug_explain: bool,
+    skip_binary_check: bool = False
+) -> Tuple[int, int]:
+    """
+    Consumes queued file loads in walk order until at most `keep` remain, appending
+    their formatted output. Runs on the walking thread, so size accounting and the
+    file that trips the size limit are the same as for a sequential walk.
+
+    Returns:
+        The updated total size in bytes and the bytes still reserved by queued loads.
+
+    Raises:
+        ContextSizeExceededError: If a file would push the total over the size limit.
+    """
+    while len(pending_loads) > keep:
+        file_path, output_rel_path, file_entry, reserved, pending = pending_loads.popleft()
+        reserved_bytes -= reserved
+        try:
+            loaded = pending.result()
+            if loaded is None:
+                continue
+            file_size, content = loaded
+            if content is None and not list_only and total_size_bytes + file_size <= size_limit_bytes:
+                # Not read because the budget was reserved by earlier loads that turned
+                # out smaller (or binary); it fits after all, so read it now.
+                loaded = load_file(file_path, size_limit_bytes - total_size_bytes, list_only, debug_explain,
+                                   skip_binary_check, file_entry)
+                if loaded is None:
+                    continue
+                file_size, content = loaded
+            file_output, file_size_added = format_file_output(
+                file_path=file_path,
+                file_size=file_size,
+                content=content,
+                output_rel_root=output_rel_root,
+                size_limit_bytes=size_limit_bytes,
+                total_size_bytes=total_size_bytes,
+                list_only=list_only,
+                include_size_in_list=include_size_in_list,
+                debug_explain=debug_explain,
+                relative_path_str=output_rel_path
+            )
+
+            if file_output is not None:
+                output_parts.append(file_output)
+                processed_files_set.add(os.fspath(file_path))
+                total_size_bytes += file_size_added
+
+        except ContextSizeExceededError:
+             # Re-raise to be caught by the main function
+             raise
+        except Exception as e_proc:
+             logger.error(f"Error processing file {file_path} via file_processor: {e_proc}")
+    return total_size_bytes, reserved_bytes
+
 def walk_and_process(
     walk_target_path: Path, # The directory path to start walking from
     rule_root: Path, # The root for rule discovery - no rules above this point will be considered
     output_rel_root: Path, # Root for calculating final relative output paths
-    initial_target_paths_set: Set[Path], # Set of explicitly provided targets (for always-include logic)
+    initial_target_paths_set: Set[str], # os.fspath of explicitly provided targets (for always-include logic)
     use_overrides: bool,
     override_spec: Optional['pathspec.PathSpec'], # Compiled override spec
     size_limit_bytes: int,
     list_only: bool,
     include_size_in_list: bool,
     debug_explain: bool,
-    exclusion_parser: Optional[Any] = None  # ExclusionParser instance for scoped exclusions
-) -> Tuple[List[str], int, Set[Path]]:
+    exclusion_parser: Optional[Any] = None,  # ExclusionParser instance for scoped exclusions
+    skip_binary_check: bool = False
+) -> Tuple[List[str], int, Set[str]]:
     """
     Walks a directory, applies rules, processes files, and returns results.
 
@@ -49,7 +148,7 @@ def walk_and_process(
                    This ensures that external targets have self-contained rule sets.
         output_rel_root: The root directory for calculating the final relative output paths
                          that appear in headers or the list output.
-        initial_target_paths_set: Set of absolute paths provided as initial targets.
+        initial_target_paths_set: Set of absolute path strings (os.fspath) provided as initial targets.
         use_overrides: Whether to use override rules instead of .contextfiles.
         override_spec: The compiled PathSpec from override rules (if use_overrides is True).
         size_limit_bytes: Maximum total context size allowed.
@@ -57,18 +156,19 @@ def walk_and_process(
         include_size_in_list: If True and list_only, prepend size to path.
         debug_explain: If True, log detailed processing steps.
         exclusion_parser: ExclusionParser instance for scoped exclusions.
+        skip_binary_check: If True, treat every included file as text without sniffing it.
 
     Returns:
         A tuple containing:
         - List of output strings (formatted file content or paths).
         - Total size in bytes of the processed file content (0 if list_only).
-        - Set of absolute paths of the files processed.
+        - Set of absolute path strings (os.fspath) of the files processed.
     """
     if pathspec is None and not use_overrides:
         raise ImportError("pathspec library is required for rule processing but not installed.")
 
     output_parts: List[str] = []
-    processed_files_set: Set[Path] = set()
+    processed_files_set: Set[str] = set() # Keyed by os.fspath, cheaper to hash than Path
     total_size_bytes: int = 0
 
     if debug_explain:
@@ -77,214 +177,312 @@ def walk_and_process(
         except Exception as e_list:
             logger.warning(f"Pre-walk listdir failed for {walk_target_path}: {e_list}")
 
-    for dirpath_str, dirnames, filenames in os.walk(str(walk_target_path), topdown=True, followlinks=False):
-        current_dir_path = Path(dirpath_str).resolve()
-        dirnames.sort()
-        filenames.sort()
-        if debug_explain: logger.debug(f"--- Walking directory: {current_dir_path} ---")
-
-        # --- Determine Active Spec and Path Match Root ---
-        active_spec: Optional['pathspec.PathSpec'] = None
-        spec_source_desc: str = "N/A"
-        # Path matching is always relative to the walk_target_path
-        path_match_root = walk_target_path
-        if debug_explain: logger.debug(f"Path matching relative to: {path_match_root}")
-
-        # Always discover rules from contextfiles and gitignore
-        context_files_in_path = _find_context_files_for_dir(current_dir_path, rule_root)
-        gitignore_files_in_path = _find_gitignore_files_for_dir(current_dir_path, rule_root)
-        
-        if debug_explain:
-            logger.debug(f"Found context files for {current_dir_path} (relative to {rule_root}): {context_files_in_path}")
-            logger.debug(f"Found gitignore files for {current_dir_path} (relative to {rule_root}): {gitignore_files_in_path}")
-
-        # Combine default rules, gitignore rules, and rules from discovered files
-        current_rules = list(DEFAULT_RULES)  # Start with defaults
-        
-        # Add gitignore rules
-        for gi_path in gitignore_files_in_path:
-            current_rules.extend(load_gitignore_as_context_rules(gi_path))
+    # Relative paths are built by slicing and joining strings off these prefixes,
+    # rather than calling Path.relative_to for every directory and file.
+    walk_root_str = os.fspath(walk_target_path)
+    walk_root_prefix_len = len(walk_root_str) if walk_root_str.endswith(os.sep) else len(walk_root_str) + 1
+    output_prefix: Optional[str] = _relative_posix_path(walk_root_str, os.fspath(output_rel_root))
+    if output_prefix is None:
+        try:
+            output_prefix = _to_posix_path(str(walk_target_path.relative_to(output_rel_root)))
+            output_prefix = '' if output_prefix == '.' else output_prefix
+        except ValueError:
+            pass # Leave output paths to format_file_output's fallback
+    if output_prefix:
+        output_prefix += '/'
+
+    # Rule files that apply to each visited directory, keyed by dirpath. A directory
+    # inherits its parent's list (the walk is top-down) plus its own rule files, so
+    # only the walk root needs the full search up to rule_root.
+    rule_files_by_dir: Dict[str, Tuple[List[Path], List[Path]]] = {}
+    # The resolved rule stack per visited directory: (scoped patterns, rules, spec,
+    # extension decisions). Children that add no rules share their parent's entry.
+    spec_by_dir: Dict[str, Tuple[Optional[List[str]], List[str], 'pathspec.PathSpec', Dict[str, bool]]] = {}
+    walk_root_within_rule_root = walk_target_path == rule_root or rule_root in walk_target_path.parents
+
+    # --- Per-walk invariants, computed once rather than per directory ---
+    # Path matching is always relative to the walk_target_path
+    path_match_root = walk_target_path
+    if debug_explain: logger.debug(f"Path matching relative to: {path_match_root}")
+
+    override_rules: List[str] = getattr(override_spec, '_original_rules', []) if use_overrides else []
+    # With a recursive ('**') include among the overrides, directories that don't match
+    # directly are still descended, since files deeper down may match.
+    keep_unmatched_dirs = use_overrides and any('**' in str(p.pattern) for p in override_spec.patterns if p.include)
+    base_source_type = "Default+Gitignore+Contextfiles" + ("+Overrides" if use_overrides else "")
+
+    executor = _get_read_executor()
+    pending_loads: Deque[Tuple[Path, Optional[str], Optional[os.DirEntry], int, Future]] = deque()
+    # Bytes promised to queued loads that haven't been accounted yet. Each load's
+    # budget leaves these out, so reads in flight never add up past the size limit.
+    reserved_bytes: int = 0
+    # Every file queued during this walk; loads are accounted later, so this (not
+    # processed_files_set) is what catches a file reached twice, e.g. via a symlink.
+    queued_files: Set[str] = set()
+    try:
+        # walk_target_path is resolved and symlinked dirs are never descended into,
+        # so every dirpath (and every non-symlink entry path) is already a real path.
+        for dirpath_str, dir_entries, file_entries in _scandir_walk(str(walk_target_path)):
+            current_dir_path = Path(dirpath_str)
+            if debug_explain: logger.debug(f"--- Walking directory: {current_dir_path} ---")
+            rel_dir = _to_posix_path(dirpath_str[walk_root_prefix_len:]) if dirpath_str != walk_root_str else ''
+            match_prefix = rel_dir + '/' if rel_dir else ''
+
+            # --- Determine Active Spec ---
+            active_spec: Optional['pathspec.PathSpec'] = None
+            parent_rule_files_inherited = None
+            spec_source_desc: str = "N/A"
+
+            # Always discover rules from contextfiles and gitignore
+            parent_dir_str = os.path.dirname(dirpath_str) if dirpath_str != walk_root_str else None
+            parent_rule_files = rule_files_by_dir.get(parent_dir_str) if parent_dir_str is not None else None
+            if parent_rule_files is None or not walk_root_within_rule_root:
+                context_files_in_path = _find_context_files_for_dir(current_dir_path, rule_root)
+                gitignore_files_in_path = _find_gitignore_files_for_dir(current_dir_path, rule_root)
+            else:
+                context_files_in_path, gitignore_files_in_path = parent_rule_files
+                # The directory listing already tells us whether this level adds any
+                for file_entry in file_entries:
+                    if file_entry.name == CONTEXT_FILENAME:
+                        context_files_in_path = context_files_in_path + [current_dir_path / CONTEXT_FILENAME]
+                    elif file_entry.name == GITIGNORE_FILENAME:
+                        gitignore_files_in_path = gitignore_files_in_path + [current_dir_path / GITIGNORE_FILENAME]
+                if context_files_in_path is parent_rule_files[0] and gitignore_files_in_path is parent_rule_files[1]:
+                    parent_rule_files_inherited = parent_rule_files # Same list objects: this level adds no rule files
+            rule_files_by_dir[dirpath_str] = (context_files_in_path, gitignore_files_in_path)
         
-        # Add context files rules
-        for cf_path in context_files_in_path:
-            current_rules.extend(load_rules_from_file(cf_path))
-
-        # If we have overrides, add them as high-priority rules at the end
-        if use_overrides:
-            override_rules = getattr(override_spec, '_original_rules', [])
-            if not override_rules and hasattr(override_spec, 'patterns'):
-                override_rules = []
-            current_rules.extend(override_rules)
             if debug_explain:
-                logger.debug(f"Added {len(override_rules)} override rules as high-priority additions")
-
-        # Add scoped exclusion patterns if applicable
-        if exclusion_parser:
-            scoped_patterns = exclusion_parser.get_scoped_patterns(current_dir_path, rule_root)
-            if scoped_patterns:
-                current_rules.extend(scoped_patterns)
-                if debug_explain:
-                    logger.debug(f"Applied {len(scoped_patterns)} scoped exclusion patterns to {current_dir_path}")
-                    for pattern in scoped_patterns:
-                        logger.debug(f"  Scoped pattern: {pattern}")
-
-        # Compile spec for this specific directory context
-        # Build the source description
-        source_parts = ["Default", "Gitignore", "Contextfiles"]
-        if use_overrides:
-            source_parts.append("Overrides")
-        if exclusion_parser and scoped_patterns:
-            source_parts.append("ScopedExclusions")
-        source_type = "+".join(source_parts)
-        
-        try:
-            relative_dir_desc = current_dir_path.relative_to(walk_target_path)
-            if str(relative_dir_desc) == '.':
-                spec_source_desc = f"{source_type} at root"
+                logger.debug(f"Found context files for {current_dir_path} (relative to {rule_root}): {context_files_in_path}")
+                logger.debug(f"Found gitignore files for {current_dir_path} (relative to {rule_root}): {gitignore_files_in_path}")
+
+            # Scoped exclusion patterns, if applicable
+            scoped_patterns = None
+            if exclusion_parser:
+                scoped_patterns = exclusion_parser.get_scoped_patterns(current_dir_path, rule_root)
+
+            # A directory that adds no rule files and has the same scoped patterns as its
+            # parent has the parent's rule stack, so its spec is reused as-is rather than
+            # re-reading (re-stat-ing) every rule file and rebuilding the rules list.
+            parent_spec_entry = spec_by_dir.get(parent_dir_str) if parent_rule_files_inherited is not None else None
+            if parent_spec_entry is not None and parent_spec_entry[0] == scoped_patterns:
+                spec_by_dir[dirpath_str] = parent_spec_entry
+                _, current_rules, active_spec, extension_decisions = parent_spec_entry
             else:
-                spec_source_desc = f"{source_type} up to ./{relative_dir_desc}"
-        except ValueError:
-            spec_source_desc = f"{source_type} up to {current_dir_path}"
-
-        if debug_explain:
-            logger.debug(f"Combined rules for {current_dir_path}: {current_rules}") # Log the combined rules list
-        active_spec = compile_spec_from_rules(current_rules, spec_source_desc)
-        if debug_explain:
-            logger.debug(f"Compiled spec for {current_dir_path} from {spec_source_desc} ({len(active_spec.patterns)} patterns)")
-            if active_spec:
-                 logger.debug(f"Active spec patterns: {[str(p.regex) for p in active_spec.patterns]}") # Log context patterns
-
-        if active_spec is None:
-             logger.error(f"Could not determine active pathspec for directory {current_dir_path}. Skipping directory content.")
-             dirnames[:] = [] # Prevent further traversal into this branch
-             continue
-
-        # --- Prune Directories ---
-        dirnames_to_remove = []
-        for dirname in dirnames:
-            sub_dir_path = (current_dir_path / dirname).resolve()
-
-            # Skip symlinks
-            if sub_dir_path.is_symlink():
-                dirnames_to_remove.append(dirname)
-                if debug_explain: logger.debug(f"Pruning Directory (Symlink): {sub_dir_path}")
-                continue
-
-            # If the directory is an explicit target, don't prune it based on rules
-            if sub_dir_path in initial_target_paths_set:
-                if debug_explain: logger.debug(f"Keeping Directory (Explicit Target): {sub_dir_path}")
-                continue # Move to the next directory without rule checks
-
-            # Check directory against active spec ONLY if not an explicit target
-            try:
-                # Path for matching should be relative to path_match_root (walk_target_path)
-                path_for_match = str(sub_dir_path.relative_to(path_match_root)).replace(os.sep, '/') + '/'
-                is_matched = active_spec.match_file(path_for_match)
-                if debug_explain: logger.debug(f"DIR MATCH CHECK: path='{path_for_match}', spec_source='{spec_source_desc}', matched={is_matched}")
-
-                # Determine if we should prune
-                should_prune = False
-                if not is_matched:
-                    # If the directory itself doesn't match, check if we should still keep it
-                    # because overrides are active and contain a recursive pattern.
-                    # Note: We check patterns in the *original* override_spec if use_overrides is True
-                    spec_to_check_for_recursion = override_spec if use_overrides else active_spec
-                    contains_recursive_pattern = any('**' in str(p.pattern) for p in spec_to_check_for_recursion.patterns if p.include)
-
-                    if use_overrides and contains_recursive_pattern:
-                        if debug_explain: logger.debug(f"Keeping directory {sub_dir_path} despite no direct match, due to recursive override pattern.")
-                        should_prune = False # Keep the directory
-                    else:
-                        # Prune if no direct match AND (not using overrides OR no recursive override pattern)
-                        should_prune = True
-
-                if should_prune:
-                    dirnames_to_remove.append(dirname)
-                    if debug_explain: logger.debug(f"Pruning Directory: {sub_dir_path} (excluded by {spec_source_desc} matching '{path_for_match}' relative to {path_match_root})")
-                elif debug_explain:
-                     # Log keeping, whether by direct match or recursive override exception
-                     reason = f"included by {spec_source_desc}" if is_matched else "kept for recursive override pattern"
-                     logger.debug(f"Keeping Directory: {sub_dir_path} ({reason} matching '{path_for_match}' relative to {path_match_root})")
-
-            except ValueError:
-                 logger.warning(f"Could not make directory path {sub_dir_path} relative to path match root {path_match_root} for pruning check. Keeping directory.")
-            except Exception as e_prune:
-                 logger.error(f"Error checking directory {sub_dir_path} against spec: {e_prune}")
-
-        if dirnames_to_remove:
-            dirnames[:] = [d for d in dirnames if d not in dirnames_to_remove]
-        # --- End Pruning ---
-
-
-        # --- Process Files in Current Directory ---
-        if debug_explain: logger.debug(f"Files in {current_dir_path}: {filenames}") # Log the list of filenames
-        for filename in filenames:
-            file_path = (current_dir_path / filename).resolve()
-
-            if file_path in processed_files_set:
-                if debug_explain: logger.debug(f"Skipping File: {file_path} -> Already processed")
-                continue
-
-            # Check if file should be included based on rules OR if it's an explicit target
-            should_include = False
-            reason = ""
-
-            # Always include if it's an explicitly provided target
-            if file_path in initial_target_paths_set:
-                should_include = True
-                reason = "Explicitly targeted"
-                if debug_explain: logger.debug(f"Including File: {file_path} ({reason})")
+                # Combine default rules, gitignore rules, and rules from discovered files
+                current_rules = list(DEFAULT_RULES)  # Start with defaults
+
+                # Add gitignore rules
+                for gi_path in gitignore_files_in_path:
+                    current_rules.extend(load_gitignore_as_context_rules(gi_path))
+
+                # Add context files rules
+                for cf_path in context_files_in_path:
+                    current_rules.extend(load_rules_from_file(cf_path))
+
+                # If we have overrides, add them as high-priority rules at the end
+                if use_overrides:
+                    current_rules.extend(override_rules)
+                    if debug_explain:
+                        logger.debug(f"Added {len(override_rules)} override rules as high-priority additions")
+
+                # Add scoped exclusion patterns
+                if scoped_patterns:
+                    current_rules.extend(scoped_patterns)
+                    if debug_explain:
+                        logger.debug(f"Applied {len(scoped_patterns)} scoped exclusion patterns to {current_dir_path}")
+                        for pattern in scoped_patterns:
+                            logger.debug(f"  Scoped pattern: {pattern}")
+
+            # Compile spec for this specific directory context
+            # Build the source description
+            source_type = base_source_type + "+ScopedExclusions" if scoped_patterns else base_source_type
+            if rel_dir:
+                spec_source_desc = f"{source_type} up to ./{rel_dir}"
             else:
-                # Otherwise, check against rules. Path matching is always relative to path_match_root (walk_target_path).
+                spec_source_desc = f"{source_type} at root"
+
+            if debug_explain:
+                logger.debug(f"Combined rules for {current_dir_path}: {current_rules}") # Log the combined rules list
+            if active_spec is None: # Not reused from the parent directory
+                if len(current_rules) == len(DEFAULT_RULES):
+                    # Nothing was added to the defaults, skip the rule tuple lookups
+                    active_spec = _get_default_spec()
+                    extension_decisions = _DEFAULT_EXTENSION_DECISIONS
+                else:
+                    active_spec = compile_spec_from_rules(current_rules, spec_source_desc)
+                    extension_decisions = compile_extension_prefilter(current_rules)
+                spec_by_dir[dirpath_str] = (scoped_patterns, current_rules, active_spec, extension_decisions)
+            if debug_explain:
+                logger.debug(f"Compiled spec for {current_dir_path} from {spec_source_desc} ({len(active_spec.patterns)} patterns)")
+                if active_spec:
+                     logger.debug(f"Active spec patterns: {[str(p.regex) for p in active_spec.patterns]}") # Log context patterns
+
+            if active_spec is None:
+                 logger.error(f"Could not determine active pathspec for directory {current_dir_path}. Skipping directory content.")
+                 dir_entries[:] = [] # Prevent further traversal into this branch
+                 continue
+
+            # --- Prune Directories ---
+            # Collect survivors in one pass; dir_entries is already sorted so order is kept
+            kept_dir_entries: List[os.DirEntry] = []
+            for dir_entry in dir_entries:
+                sub_dir_path = dir_entry.path # Only used for logging
+
+                # Skip symlinks
+                if dir_entry.is_symlink():
+                    if debug_explain: logger.debug(f"Pruning Directory (Symlink): {sub_dir_path}")
+                    continue
+
+                # If the directory is an explicit target, don't prune it based on rules
+                if dir_entry.path in initial_target_paths_set:
+                    if debug_explain: logger.debug(f"Keeping Directory (Explicit Target): {sub_dir_path}")
+                    kept_dir_entries.append(dir_entry)
+                    continue # Move to the next directory without rule checks
+
+                # Check directory against active spec ONLY if not an explicit target
                 try:
                     # Path for matching should be relative to path_match_root (walk_target_path)
-                    path_for_match = str(file_path.relative_to(path_match_root)).replace(os.sep, '/')
-                    # if debug_explain: logger.debug(f"Checking file: {file_path} against spec {spec_source_desc} using path: '{path_for_match}' relative to {path_match_root}")
+                    path_for_match = match_prefix + dir_entry.name + '/'
                     is_matched = active_spec.match_file(path_for_match)
-                    if debug_explain: logger.debug(f"FILE MATCH CHECK: path='{path_for_match}', spec_source='{spec_source_desc}', matched={is_matched}")
-                    if is_matched:
-                        should_include = True
-                        reason = f"Included by {spec_source_desc}"
-                        if debug_explain: logger.debug(f"Including File: {file_path} ({reason} matching '{path_for_match}' relative to {path_match_root})")
-                    else:
-                        reason = f"Excluded by {spec_source_desc}"
-                        if debug_explain: logger.debug(f"Excluding File: {file_path} ({reason} matching '{path_for_match}' relative to {path_match_root})")
-                except ValueError:
-                     logger.warning(f"Could not make file path {file_path} relative to path match root {path_match_root} for rule check. Excluding file.")
-                     reason = "Error calculating relative path for rule check"
-                except Exception as e_match:
-                     logger.error(f"Error checking file {file_path} against spec: {e_match}")
-                     reason = f"Error during rule check: {e_match}"
+                    if debug_explain: logger.debug(f"DIR MATCH CHECK: path='{path_for_match}', spec_source='{spec_source_desc}', matched={is_matched}")
+
+                    # Determine if we should prune
+                    should_prune = False
+                    if not is_matched:
+                        # If the directory itself doesn't match, check if we should still keep it
+                        # because overrides are active and contain a recursive pattern.
+                        if keep_unmatched_dirs:
+                            if debug_explain: logger.debug(f"Keeping directory {sub_dir_path} despite no direct match, due to recursive override pattern.")
+                            should_prune = False # Keep the directory
+                        else:
+                            # Prune if no direct match AND (not using overrides OR no recursive override pattern)
+                            should_prune = True
+
+                    if should_prune:
+                        if debug_explain: logger.debug(f"Pruning Directory: {sub_dir_path} (excluded by {spec_source_desc} matching '{path_for_match}' relative to {path_match_root})")
+                        continue
+                    elif debug_explain:
+                         # Log keeping, whether by direct match or recursive override exception
+                         reason = f"included by {spec_source_desc}" if is_matched else "kept for recursive override pattern"
+                         logger.debug(f"Keeping Directory: {sub_dir_path} ({reason} matching '{path_for_match}' relative to {path_match_root})")
 
-
-            if not should_include:
-                continue
-
-            # --- Passed Rule Check ---
-            # Call file processor
-            try:
-                file_output, file_size_added = process_file(
-                    file_path=file_path,
-                    output_rel_root=output_rel_root,
-                    size_limit_bytes=size_limit_bytes,
-                    total_size_bytes=total_size_bytes,
-                    list_only=list_only,
-                    include_size_in_list=include_size_in_list,
-                    debug_explain=debug_explain
-                )
-
-                if file_output is not None:
-                    output_parts.append(file_output)
-                    processed_files_set.add(file_path)
-                    total_size_bytes += file_size_added
-
-            except ContextSizeExceededError:
-                 # Re-raise to be caught by the main function
-                 raise
-            except Exception as e_proc:
-                 logger.error(f"Error processing file {file_path} via file_processor: {e_proc}")
-
-        # --- End File Loop ---
+                except ValueError:
+                     logger.warning(f"Could not make directory path {sub_dir_path} relative to path match root {path_match_root} for pruning check. Keeping directory.")
+                except Exception as e_prune:
+                     logger.error(f"Error checking directory {sub_dir_path} against spec: {e_prune}")
+
+                kept_dir_entries.append(dir_entry)
+
+            dir_entries[:] = kept_dir_entries
+            # --- End Pruning ---
+
+
+            # --- Process Files in Current Directory ---
+            if debug_explain: logger.debug(f"Files in {current_dir_path}: {[e.name for e in file_entries]}") # Log the list of filenames
+            files_to_process: List[Tuple[Path, os.DirEntry, Optional[str]]] = []
+            # Directory-level patterns are decided once here for all files in this directory
+            match_in_dir = compile_directory_file_matcher(active_spec, match_prefix) if file_entries else None
+            for file_entry in file_entries:
+                # Only symlinks need resolving; they are processed (and matched) as their target.
+                # Other files stay plain strings until included, so excluded ones never build a Path.
+                file_path: Optional[Path] = None
+                if file_entry.is_symlink():
+                    file_path = Path(file_entry.path).resolve()
+                    file_path_str = os.fspath(file_path)
+                    entry_rel_path = None
+                else:
+                    file_path_str = file_entry.path
+                    entry_rel_path = match_prefix + file_entry.name
+
+                if file_path_str in queued_files:
+                    if debug_explain: logger.debug(f"Skipping File: {file_path_str} -> Already processed")
+                    continue
+
+                # Check if file should be included based on rules OR if it's an explicit target
+                # (reasons are only formatted when debug_explain is on)
+                should_include = False
+
+                # Always include if it's an explicitly provided target
+                if file_path_str in initial_target_paths_set:
+                    should_include = True
+                    if debug_explain: logger.debug(f"Including File: {file_path_str} (Explicitly targeted)")
+                else:
+                    # Otherwise, check against rules. Path matching is always relative to path_match_root (walk_target_path).
+                    try:
+                        # Path for matching should be relative to path_match_root (walk_target_path)
+                        if entry_rel_path is not None:
+                            path_for_match = entry_rel_path
+                        else:
+                            path_for_match = _relative_posix_path(file_path_str, walk_root_str)
+                            if path_for_match is None: # Outside the walk root (or differently cased on Windows)
+                                path_for_match = _to_posix_path(str(file_path.relative_to(path_match_root)))
+                        # if debug_explain: logger.debug(f"Checking file: {file_path} against spec {spec_source_desc} using path: '{path_for_match}' relative to {path_match_root}")
+                        # Try deciding by extension alone before running the full spec
+                        match_dir, _, match_name = path_for_match.rpartition('/')
+                        extension = match_name.rpartition('.')[2] if '.' in match_name else None
+                        if extension in extension_decisions and '.' not in match_dir:
+                            is_matched = extension_decisions[extension]
+                        elif entry_rel_path is not None:
+                            is_matched = match_in_dir(path_for_match)
+                        else:
+                            is_matched = active_spec.match_file(path_for_match) # Symlink target, may live elsewhere
+                        if debug_explain: logger.debug(f"FILE MATCH CHECK: path='{path_for_match}', spec_source='{spec_source_desc}', matched={is_matched}")
+                        if is_matched:
+                            should_include = True
+                            if debug_explain: logger.debug(f"Including File: {file_path_str} (Included by {spec_source_desc} matching '{path_for_match}' relative to {path_match_root})")
+                        elif debug_explain:
+                            logger.debug(f"Excluding File: {file_path_str} (Excluded by {spec_source_desc} matching '{path_for_match}' relative to {path_match_root})")
+                    except ValueError:
+                         logger.warning(f"Could not make file path {file_path_str} relative to path match root {path_match_root} for rule check. Excluding file.")
+                    except Exception as e_match:
+                         logger.error(f"Error checking file {file_path_str} against spec: {e_match}")
+
+
+                if not should_include:
+                    continue
+
+                if file_path is None:
+                    file_path = Path(file_path_str)
+                output_rel_path = output_prefix + entry_rel_path if output_prefix is not None and entry_rel_path is not None else None
+                files_to_process.append((file_path, file_entry, output_rel_path))
+                queued_files.add(file_path_str)
+
+            # --- Queue Included Files ---
+            # Reads run ahead on the pool, across directories, while the walk continues.
+            # Each load's budget excludes the bytes reserved by the loads queued before
+            # it, so a file that may not fit is not read until accounting reaches it.
+            for file_path, file_entry, output_rel_path in files_to_process:
+                if len(pending_loads) >= READ_AHEAD_FILES:
+                    total_size_bytes, reserved_bytes = _account_loaded_files(
+                        pending_loads, READ_AHEAD_FILES - 1, output_parts, processed_files_set, total_size_bytes,
+                        reserved_bytes, output_rel_root, size_limit_bytes, list_only, include_size_in_list,
+                        debug_explain, skip_binary_check
+                    )
+                remaining_budget = size_limit_bytes - total_size_bytes - reserved_bytes
+                reserved = 0
+                if not list_only:
+                    try:
+                        file_size = file_entry.stat().st_size if file_entry is not None else os.stat(file_path).st_size
+                    except OSError:
+                        file_size = 0 # load_file reports the error
+                    if file_size <= remaining_budget:
+                        reserved = file_size # Only files that will be read hold budget
+                reserved_bytes += reserved
+                pending_loads.append((file_path, output_rel_path, file_entry, reserved, executor.submit(
+                    load_file, file_path, remaining_budget, list_only, debug_explain, skip_binary_check, file_entry
+                )))
+
+            # --- End File Loop ---
+
+        total_size_bytes, reserved_bytes = _account_loaded_files(
+            pending_loads, 0, output_parts, processed_files_set, total_size_bytes,
+            reserved_bytes, output_rel_root, size_limit_bytes, list_only, include_size_in_list,
+            debug_explain, skip_binary_check
+        )
+    finally:
+        # Drop queued reads that are no longer needed (e.g. size limit exceeded)
+        for _, _, _, _, pending in pending_loads:
+            pending.cancel()
     # --- End os.walk Loop ---
 
     return output_parts, total_size_bytes, processed_files_set
\ No newline at end of file
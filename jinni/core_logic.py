@@ -49,7 +49,8 @@ def read_context(
     size_limit_mb: Optional[int] = None,
     debug_explain: bool = False,
     include_size_in_list: bool = False,
-    exclusion_parser: Optional[Any] = None  # ExclusionParser instance for scoped exclusions
+    exclusion_parser: Optional[Any] = None,  # ExclusionParser instance for scoped exclusions
+    skip_binary_check: bool = False
 ) -> str:
     """
     Orchestrates the context reading process, handling flexible inputs.
@@ -67,6 +68,10 @@ def read_context(
         size_limit_mb: Optional override for the size limit in MB.
         debug_explain: If True, log inclusion/exclusion reasons.
         include_size_in_list: If True and list_only, prepend size to path.
+        exclusion_parser: Optional ExclusionParser instance for scoped exclusions.
+        skip_binary_check: If True, treat every included file as text without sniffing it.
+                           Useful for callers that know their inputs, particularly with
+                           list_only where it avoids opening files at all.
 
     Returns:
         A formatted string (concatenated content or file list).
@@ -121,7 +126,10 @@ def read_context(
     # Determine roots IF project_root wasn't provided explicitly
     if not project_root_path:
         try:
-            common_ancestor = Path(os.path.commonpath([str(p) for p in target_paths]))
+            if len(target_paths) == 1:
+                common_ancestor = target_paths[0] # Already resolved, nothing to compare against
+            else:
+                common_ancestor = Path(os.path.commonpath([os.fspath(p) for p in target_paths]))
             calculated_root = common_ancestor if common_ancestor.is_dir() else common_ancestor.parent
         except ValueError:
             logger.warning("Could not find common ancestor for targets. Using CWD as root.")
@@ -176,10 +184,10 @@ def read_context(
 
     # --- Processing State ---
     output_parts: List[str] = []
-    processed_files_set: Set[Path] = set()
+    processed_files_set: Set[str] = set() # Keyed by os.fspath
     total_size_bytes: int = 0
     # Use the resolved target_paths as the initial set for "always include" logic within walker/processor
-    initial_target_paths_set: Set[Path] = set(target_paths)
+    initial_target_paths_set: Set[str] = {os.fspath(p) for p in target_paths}
 
     # --- Compute a root for each target ---
     roots_for_target: Dict[Path, Path] = {}
@@ -210,11 +218,11 @@ def read_context(
             grouped = [t for t, r in roots_for_target.items() if r == root]
             
             # Build an "always include" set for this root
-            initial_set = set(grouped)
+            initial_set = {os.fspath(t) for t in grouped}
             
             for current_target_path in grouped:
                 # Skip if already processed (e.g., listed twice or handled by a previous dir walk)
-                if current_target_path in processed_files_set:
+                if os.fspath(current_target_path) in processed_files_set:
                      if debug_explain: logger.debug(f"Skipping target {current_target_path} as it was already processed.")
                      continue
 
@@ -227,21 +235,14 @@ def read_context(
                         total_size_bytes=total_size_bytes,
                         list_only=list_only,
                         include_size_in_list=include_size_in_list,
-                        debug_explain=debug_explain
+                        debug_explain=debug_explain,
+                        skip_binary_check=skip_binary_check
                     )
+                    # process_file has already checked this file against the remaining budget
+                    # (skipping it or raising ContextSizeExceededError)
                     if file_output is not None:
-                        # Check if adding this file *content* exceeds limit (only if not list_only)
-                        if not list_only and (total_size_bytes + file_size_added > size_limit_bytes):
-                             # Check if file alone exceeds limit
-                             if file_size_added > size_limit_bytes and total_size_bytes == 0:
-                                  logger.warning(f"File {current_target_path} ({file_size_added} bytes) content exceeds size limit of {effective_limit_mb}MB. Skipping.")
-                                  continue # Skip this file
-                             else:
-                                  # Adding this file pushes over the limit
-                                  raise ContextSizeExceededError(effective_limit_mb, total_size_bytes + file_size_added, current_target_path)
-
                         output_parts.append(file_output)
-                        processed_files_set.add(current_target_path)
+                        processed_files_set.add(os.fspath(current_target_path))
                         total_size_bytes += file_size_added # Add size only if content included
 
                 elif current_target_path.is_dir():
@@ -257,7 +258,8 @@ def read_context(
                         list_only=list_only,
                         include_size_in_list=include_size_in_list,
                         debug_explain=debug_explain,
-                        exclusion_parser=exclusion_parser # Pass exclusion parser for scoped exclusions
+                        exclusion_parser=exclusion_parser, # Pass exclusion parser for scoped exclusions
+                        skip_binary_check=skip_binary_check
                     )
                     output_parts.extend(dir_output_parts)
                     processed_files_set.update(dir_processed_files)
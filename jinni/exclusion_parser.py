@@ -8,58 +8,52 @@ import logging
 from typing import List, Dict, Set, Tuple, Optional
 from pathlib import Path
 
+from .utils import _relative_posix_path
+
 logger = logging.getLogger("jinni.exclusion_parser")
 
+# Pattern groups for ExclusionParser.MODULE_PATTERNS
+_TEST_PATTERNS = ("**/test/**", "**/tests/**", "**/*_test/**", "**/*_tests/**",
+                  "**/test_*/**", "**/test_*", "**/*.test.*", "**/*.spec.*", "**/spec/**")
+_VENDOR_PATTERNS = ("vendor/**", "**/vendor/**", "third_party/**", "**/third_party/**",
+                    "external/**", "**/external/**")
+_DOC_PATTERNS = ("docs/**", "**/docs/**", "documentation/**", "**/documentation/**",
+                 "doc/**", "**/doc/**")
+_BUILD_PATTERNS = ("build/**", "**/build/**", "dist/**", "**/dist/**",
+                   "out/**", "**/out/**", "target/**", "**/target/**")
+_EXAMPLE_PATTERNS = ("examples/**", "**/examples/**", "example/**", "**/example/**",
+                     "samples/**", "**/samples/**", "demo/**", "**/demo/**")
+_CACHE_PATTERNS = ("cache/**", "**/cache/**", ".cache/**", "**/.cache/**",
+                   "__pycache__/**", "**/__pycache__/**")
+_TEMP_PATTERNS = ("tmp/**", "**/tmp/**", "temp/**", "**/temp/**",
+                  "*.tmp", "*.temp", "**/*.tmp", "**/*.temp")
+_LOG_PATTERNS = ("logs/**", "**/logs/**", "*.log", "**/*.log",
+                 "log/**", "**/log/**")
+_GENERATED_PATTERNS = ("generated/**", "**/generated/**", "gen/**", "**/gen/**",
+                       "*_generated.*", "**/*_generated.*", "*.generated.*", "**/*.generated.*")
+_LEGACY_PATTERNS = ("legacy/**", "**/legacy/**", "old/**", "**/old/**",
+                    "deprecated/**", "**/deprecated/**")
+_EXPERIMENTAL_PATTERNS = ("experimental/**", "**/experimental/**", "experiment/**",
+                          "**/experiment/**", "proto/**", "**/proto/**", "wip/**", "**/wip/**")
+
 
 class ExclusionParser:
     """Parses and converts high-level exclusion directives to pathspec patterns."""
     
-    # Common module/directory keywords and their typical patterns
+    # Common module/directory keywords and their typical patterns. Singular/plural
+    # aliases share one tuple rather than holding duplicate lists.
     MODULE_PATTERNS = {
-        "tests": ["**/test/**", "**/tests/**", "**/*_test/**", "**/*_tests/**", 
-                  "**/test_*/**", "**/test_*", "**/*.test.*", "**/*.spec.*", "**/spec/**"],
-        "test": ["**/test/**", "**/tests/**", "**/*_test/**", "**/*_tests/**", 
-                 "**/test_*/**", "**/test_*", "**/*.test.*", "**/*.spec.*", "**/spec/**"],
-        "vendor": ["vendor/**", "**/vendor/**", "third_party/**", "**/third_party/**",
-                   "external/**", "**/external/**"],
-        "vendors": ["vendor/**", "**/vendor/**", "third_party/**", "**/third_party/**",
-                    "external/**", "**/external/**"],
-        "docs": ["docs/**", "**/docs/**", "documentation/**", "**/documentation/**",
-                 "doc/**", "**/doc/**"],
-        "doc": ["docs/**", "**/docs/**", "documentation/**", "**/documentation/**",
-                "doc/**", "**/doc/**"],
-        "build": ["build/**", "**/build/**", "dist/**", "**/dist/**", 
-                  "out/**", "**/out/**", "target/**", "**/target/**"],
-        "builds": ["build/**", "**/build/**", "dist/**", "**/dist/**", 
-                   "out/**", "**/out/**", "target/**", "**/target/**"],
-        "examples": ["examples/**", "**/examples/**", "example/**", "**/example/**",
-                     "samples/**", "**/samples/**", "demo/**", "**/demo/**"],
-        "example": ["examples/**", "**/examples/**", "example/**", "**/example/**",
-                    "samples/**", "**/samples/**", "demo/**", "**/demo/**"],
-        "cache": ["cache/**", "**/cache/**", ".cache/**", "**/.cache/**",
-                  "__pycache__/**", "**/__pycache__/**"],
-        "caches": ["cache/**", "**/cache/**", ".cache/**", "**/.cache/**",
-                   "__pycache__/**", "**/__pycache__/**"],
-        "temp": ["tmp/**", "**/tmp/**", "temp/**", "**/temp/**", 
-                 "*.tmp", "*.temp", "**/*.tmp", "**/*.temp"],
-        "tmp": ["tmp/**", "**/tmp/**", "temp/**", "**/temp/**", 
-                "*.tmp", "*.temp", "**/*.tmp", "**/*.temp"],
-        "logs": ["logs/**", "**/logs/**", "*.log", "**/*.log", 
-                 "log/**", "**/log/**"],
-        "log": ["logs/**", "**/logs/**", "*.log", "**/*.log", 
-                "log/**", "**/log/**"],
-        "generated": ["generated/**", "**/generated/**", "gen/**", "**/gen/**",
-                      "*_generated.*", "**/*_generated.*", "*.generated.*", "**/*.generated.*"],
-        "gen": ["generated/**", "**/generated/**", "gen/**", "**/gen/**",
-                "*_generated.*", "**/*_generated.*", "*.generated.*", "**/*.generated.*"],
-        "legacy": ["legacy/**", "**/legacy/**", "old/**", "**/old/**",
-                   "deprecated/**", "**/deprecated/**"],
-        "old": ["legacy/**", "**/legacy/**", "old/**", "**/old/**",
-                "deprecated/**", "**/deprecated/**"],
-        "experimental": ["experimental/**", "**/experimental/**", "experiment/**", 
-                         "**/experiment/**", "proto/**", "**/proto/**", "wip/**", "**/wip/**"],
-        "experiment": ["experimental/**", "**/experimental/**", "experiment/**", 
-                       "**/experiment/**", "proto/**", "**/proto/**", "wip/**", "**/wip/**"],
+        "tests": _TEST_PATTERNS, "test": _TEST_PATTERNS,
+        "vendor": _VENDOR_PATTERNS, "vendors": _VENDOR_PATTERNS,
+        "docs": _DOC_PATTERNS, "doc": _DOC_PATTERNS,
+        "build": _BUILD_PATTERNS, "builds": _BUILD_PATTERNS,
+        "examples": _EXAMPLE_PATTERNS, "example": _EXAMPLE_PATTERNS,
+        "cache": _CACHE_PATTERNS, "caches": _CACHE_PATTERNS,
+        "temp": _TEMP_PATTERNS, "tmp": _TEMP_PATTERNS,
+        "logs": _LOG_PATTERNS, "log": _LOG_PATTERNS,
+        "generated": _GENERATED_PATTERNS, "gen": _GENERATED_PATTERNS,
+        "legacy": _LEGACY_PATTERNS, "old": _LEGACY_PATTERNS,
+        "experimental": _EXPERIMENTAL_PATTERNS, "experiment": _EXPERIMENTAL_PATTERNS,
     }
     
     def __init__(self):
@@ -67,35 +61,40 @@ class ExclusionParser:
         self.scoped_exclusions: Dict[str, List[str]] = {}
         self.file_patterns: List[str] = []
         self.keep_only: Optional[List[str]] = None
+        # Derived from scoped_exclusions on first use, see _get_scope_index
+        self._scope_index_source: Optional[Dict[str, List[str]]] = None
+        self._scope_index: List[Tuple[Tuple[str, ...], str, List[str]]] = []
+        self._scoped_patterns_by_dir: Dict[Tuple[str, ...], List[str]] = {}
     
     def parse_not(self, keywords: List[str]) -> List[str]:
         """
         Parse --not keywords into exclusion patterns.
         E.g., --not "tests" -> patterns to exclude all test-related files
         """
+        # Collected already prefixed with ! for exclusion in pathspec
         patterns = []
         for keyword in keywords:
             keyword_lower = keyword.lower().strip()
             
             # Check if it's a known module pattern
-            if keyword_lower in self.MODULE_PATTERNS:
-                patterns.extend(self.MODULE_PATTERNS[keyword_lower])
-                logger.debug(f"Expanded '{keyword}' to module patterns: {self.MODULE_PATTERNS[keyword_lower]}")
+            module_patterns = self.MODULE_PATTERNS.get(keyword_lower)
+            if module_patterns is not None:
+                patterns += ["!" + p for p in module_patterns]
+                logger.debug(f"Expanded '{keyword}' to module patterns: {module_patterns}")
             else:
                 # Treat as a literal directory/file pattern
                 # Support both exact directory and nested occurrences
-                patterns.extend([
-                    f"{keyword}/**",           # Exact directory at any level
-                    f"**/{keyword}/**",        # Nested directory
-                    f"*{keyword}*/**",         # Directory containing keyword
-                    f"**/*{keyword}*/**",      # Nested directory containing keyword
-                    f"*{keyword}*",            # Files containing keyword at root
-                    f"**/*{keyword}*"          # Files containing keyword anywhere
-                ])
+                patterns += [
+                    f"!{keyword}/**",           # Exact directory at any level
+                    f"!**/{keyword}/**",        # Nested directory
+                    f"!*{keyword}*/**",         # Directory containing keyword
+                    f"!**/*{keyword}*/**",      # Nested directory containing keyword
+                    f"!*{keyword}*",            # Files containing keyword at root
+                    f"!**/*{keyword}*"          # Files containing keyword anywhere
+                ]
                 logger.debug(f"Created general patterns for '{keyword}'")
         
-        # Prefix with ! for exclusion in pathspec
-        return [f"!{p}" for p in patterns]
+        return patterns
     
     def parse_not_in(self, scoped_exclusions: List[str]) -> Dict[str, List[str]]:
         """
@@ -216,42 +215,67 @@ class ExclusionParser:
         
         return all_patterns
     
+    @staticmethod
+    def _adjust_scoped_patterns(scope: str, scope_patterns: List[str]) -> List[str]:
+        """Prefixes a scope's patterns with the scope path for pathspec matching."""
+        adjusted_patterns = []
+        for pattern in scope_patterns:
+            if pattern.startswith("!"):
+                # For exclusion patterns, prepend the scope path
+                adjusted_patterns.append(f"!{scope}/{pattern[1:]}")
+            else:
+                # For inclusion patterns (shouldn't happen in our case)
+                adjusted_patterns.append(f"{scope}/{pattern}")
+        return adjusted_patterns
+
+    def _get_scope_index(self) -> List[Tuple[Tuple[str, ...], str, List[str]]]:
+        """
+        Returns (scope parts, scope, scope-prefixed patterns) for each scope, built once
+        rather than per directory. Rebuilt (dropping memoized results) when
+        scoped_exclusions is reassigned, so replace the dict rather than mutating it in place.
+        """
+        if self._scope_index_source is not self.scoped_exclusions:
+            self._scope_index = [(Path(scope).parts, scope, self._adjust_scoped_patterns(scope, scope_patterns))
+                                 for scope, scope_patterns in self.scoped_exclusions.items()]
+            self._scope_index_source = self.scoped_exclusions
+            self._scoped_patterns_by_dir = {}
+        return self._scope_index
+
     def get_scoped_patterns(self, current_path: Path, walk_root: Path) -> List[str]:
         """
         Get exclusion patterns that apply to the current directory based on scope.
         Used during directory traversal to apply scoped exclusions.
+        Results are memoized per relative directory; callers must not modify them.
         """
         if not self.scoped_exclusions:
             return []
         
-        try:
-            rel_path = current_path.relative_to(walk_root)
-            path_parts = rel_path.parts
-        except ValueError:
-            return []
+        # By string prefix, this runs for every walked directory
+        rel_path = _relative_posix_path(str(current_path), str(walk_root))
+        if rel_path is None:
+            try:
+                rel_path = current_path.relative_to(walk_root).as_posix()
+            except ValueError:
+                return []
+        path_parts = tuple(rel_path.split('/')) if rel_path and rel_path != '.' else ()
         
+        scope_index = self._get_scope_index()
+        cached = self._scoped_patterns_by_dir.get(path_parts)
+        if cached is not None:
+            return cached
+
         patterns = []
         
         # Check each scope to see if it applies to current path
-        for scope, scope_patterns in self.scoped_exclusions.items():
+        for scope_parts, scope, adjusted_patterns in scope_index:
             # Check if we're within this scope
-            scope_parts = Path(scope).parts
             if len(path_parts) >= len(scope_parts):
                 # Check if the scope matches the beginning of our path
                 if path_parts[:len(scope_parts)] == scope_parts:
-                    # Adjust patterns to include the scope prefix for pathspec matching
-                    adjusted_patterns = []
-                    for pattern in scope_patterns:
-                        if pattern.startswith("!"):
-                            # For exclusion patterns, prepend the scope path
-                            adjusted_pattern = f"!{scope}/{pattern[1:]}"
-                            adjusted_patterns.append(adjusted_pattern)
-                        else:
-                            # For inclusion patterns (shouldn't happen in our case)
-                            adjusted_patterns.append(f"{scope}/{pattern}")
                     patterns.extend(adjusted_patterns)
                     logger.debug(f"Applied scoped exclusions for '{scope}' at '{rel_path}' with adjusted patterns: {adjusted_patterns}")
         
+        self._scoped_patterns_by_dir[path_parts] = patterns
         return patterns
 
 
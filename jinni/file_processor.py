@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
 
 # Import necessary components from other modules (adjust as needed)
-from .utils import get_file_info, _is_binary # Assuming utils.py exists
+from .utils import get_file_info, _is_binary, _to_posix_path, _relative_posix_path, _read_file_bytes, _read_file_bytes_if_text # Assuming utils.py exists
 from .exceptions import ContextSizeExceededError # Assuming exceptions.py exists
 
 # Setup logger for this module
@@ -15,102 +15,213 @@ logger = logging.getLogger("jinni.file_processor")
 if not logger.handlers and not logging.getLogger().handlers:
      logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def process_file(
+# Output block for a file: path header, content, closing backticks.
+# %-formatting a single template avoids building the header and concatenating per file.
+FILE_BLOCK_TEMPLATE = "```path=%s\n%s\n```\n"
+
+def load_file(
+    file_path: Path,
+    size_limit_bytes: int,
+    list_only: bool,
+    debug_explain: bool,
+    skip_binary_check: bool = False,
+    file_entry: Optional[os.DirEntry] = None
+) -> Optional[Tuple[int, Optional[str]]]:
+    """
+    I/O phase of file processing: binary check, stat, read and decode.
+
+    Touches no shared state, so it is safe to run from worker threads. Size
+    accounting against the running total is left to `format_file_output`.
+
+    Args:
+        file_path: Absolute path to the file to load.
+        size_limit_bytes: Remaining context budget in bytes, not counting bytes already
+                          promised to loads still in flight. Files larger than this are
+                          not read; the caller reads them later if they fit after all.
+        list_only: If True, skip reading the content. Only the binary check and stat remain.
+        debug_explain: If True, log detailed processing steps.
+        skip_binary_check: If True, trust that the file is text and skip the binary sniff.
+                           Combined with list_only this leaves a single stat per file.
+        file_entry: The os.DirEntry the walker found this file through, if any. Its
+                    stat() is cached (free on Windows) and follows symlinks to the target.
+
+    Returns:
+        None if the file should be skipped (binary or unreadable), otherwise
+        a tuple of (size in bytes, decoded content). Content is None if list_only or if
+        the file was too large to read.
+    """
+    if debug_explain: logger.debug(f"Processing file: {file_path}")
+
+    # Stat once, shared by the binary check (cache key) and the size lookup
+    try:
+        file_stat: Optional[os.stat_result] = file_entry.stat() if file_entry is not None else os.stat(file_path)
+    except OSError:
+        file_stat = None
+
+    if file_stat is not None:
+        file_stat_size = file_stat.st_size # Only the size is needed, skip get_file_info's mtime formatting
+    else:
+        file_stat_size = get_file_info(file_path)['size'] # Retries the stat, logs and reports 0 on failure
+    read_content = not list_only and file_stat_size <= size_limit_bytes
+
+    # Binary check. Files whose content is read below are checked on that same open
+    # file instead, so a content sniff doesn't cost a second open.
+    if not skip_binary_check and not read_content and _is_binary(file_path, file_stat):
+        if debug_explain: logger.debug(f"Skipping File: {file_path} -> Detected as binary (check applied for list_only={list_only})")
+        return None
+
+    if not read_content:
+        return file_stat_size, None
+
+    try:
+        # Sized from the stat above: one read syscall instead of read_bytes()'s fstat/seek/read loop.
+        # Capped at the budget in case the file grew since the stat.
+        if skip_binary_check:
+            file_bytes = _read_file_bytes(file_path, file_stat_size, size_limit_bytes)
+        else:
+            file_bytes = _read_file_bytes_if_text(file_path, file_stat, file_stat_size, size_limit_bytes)
+            if file_bytes is None:
+                if debug_explain: logger.debug(f"Skipping File: {file_path} -> Detected as binary (check applied for list_only={list_only})")
+                return None
+    except OSError as e_read:
+        logger.warning(f"Error reading file {file_path}: {e_read}")
+        return None
+    if len(file_bytes) > size_limit_bytes:
+        # Grew past the budget after the stat: it can't be included, so don't decode it
+        if debug_explain: logger.debug(f"File {file_path} grew past the size limit while being read")
+        return max(len(file_bytes), get_file_info(file_path)['size']), None
+
+    content: Optional[str] = None
+    if file_bytes.isascii():
+        # Most source files are pure ASCII, which needs no multi-byte decoding
+        content = file_bytes.decode('ascii')
+        if debug_explain: logger.debug(f"Decoded {file_path} using ascii")
+    else:
+        try:
+            content = file_bytes.decode('utf-8')
+            if debug_explain: logger.debug(f"Decoded {file_path} using utf-8")
+        except UnicodeDecodeError:
+            # Single fallback pass: cp1252 covers latin-1's printable range, and the
+            # five bytes it leaves undefined become U+FFFD rather than failing the file
+            content = file_bytes.decode('cp1252', errors='replace')
+            if debug_explain: logger.debug(f"Decoded {file_path} using cp1252 (utf-8 failed)")
+
+    # Report the size actually read, the file may have changed since the stat
+    return len(file_bytes), content
+
+def format_file_output(
     file_path: Path,
+    file_size: int,
+    content: Optional[str],
     output_rel_root: Path,
     size_limit_bytes: int,
     total_size_bytes: int,
     list_only: bool,
     include_size_in_list: bool,
-    debug_explain: bool
+    debug_explain: bool,
+    relative_path_str: Optional[str] = None
 ) -> Tuple[Optional[str], int]:
     """
-    Processes a single file: checks size, binary status, reads content, formats output.
+    Accounting phase of file processing: size limit check and output formatting.
+
+    Must be called in output order, as it depends on the running total.
 
     Args:
-        file_path: Absolute path to the file to process.
+        file_path: Absolute path to the file being processed.
+        file_size: Size of the file as returned by `load_file`.
+        content: Decoded content as returned by `load_file`.
         output_rel_root: The root directory for calculating relative paths in output.
         size_limit_bytes: Maximum total context size allowed in bytes.
         total_size_bytes: Current total size of context processed so far.
         list_only: If True, only return the relative path (optionally with size).
         include_size_in_list: If True and list_only is True, prepend size to path.
         debug_explain: If True, log detailed processing steps.
+        relative_path_str: Precomputed POSIX path relative to output_rel_root, if the
+                           caller already has it; computed from file_path otherwise.
 
     Returns:
-        A tuple containing:
-        - The formatted output string (header + content or path string), or None if skipped.
-        - The size of the file content added (0 if skipped or list_only).
+        Same as `process_file`.
 
     Raises:
         ContextSizeExceededError: If adding this file would exceed the size limit.
     """
-    if debug_explain: logger.debug(f"Processing file: {file_path}")
-
-    # Perform binary check first
-    if _is_binary(file_path):
-        if debug_explain: logger.debug(f"Skipping File: {file_path} -> Detected as binary (check applied for list_only={list_only})")
-        return None, 0
-
-    # Binary check passed, now get info and check size
-    file_info = get_file_info(file_path)
-    file_stat_size = file_info['size']
-
-    if total_size_bytes + file_stat_size > size_limit_bytes:
-        if file_stat_size > size_limit_bytes and total_size_bytes == 0:
+    if total_size_bytes + file_size > size_limit_bytes:
+        if file_size > size_limit_bytes and total_size_bytes == 0:
             # Log warning only if size check fails *after* passing binary check
-            logger.warning(f"File {file_path} ({file_stat_size} bytes) exceeds size limit of {size_limit_bytes / (1024*1024):.2f}MB. Skipping.")
+            logger.warning(f"File {file_path} ({file_size} bytes) exceeds size limit of {size_limit_bytes / (1024*1024):.2f}MB. Skipping.")
             return None, 0 # Skip this file
         else:
             # Raise error if adding this file exceeds limit (even if file itself is smaller)
-            raise ContextSizeExceededError(int(size_limit_bytes / (1024*1024)), total_size_bytes + file_stat_size, file_path)
+            raise ContextSizeExceededError(int(size_limit_bytes / (1024*1024)), total_size_bytes + file_size, file_path)
 
     # --- Both binary and size checks passed ---
 
     # Get relative path for output
-    try:
-        relative_path_str = str(file_path.relative_to(output_rel_root)).replace(os.sep, '/')
-    except ValueError:
-        relative_path_str = str(file_path) # Fallback
+    if relative_path_str is None:
+        relative_path_str = _relative_posix_path(os.fspath(file_path), os.fspath(output_rel_root))
+    if relative_path_str is None:
+        try:
+            relative_path_str = _to_posix_path(str(file_path.relative_to(output_rel_root)))
+        except ValueError:
+            relative_path_str = str(file_path) # Fallback
 
     # Prepare output
     if list_only:
-        output_line = f"{file_stat_size}\t{relative_path_str}" if include_size_in_list else relative_path_str
+        output_line = f"{file_size}\t{relative_path_str}" if include_size_in_list else relative_path_str
         if debug_explain: logger.debug(f"Adding to list: {output_line}")
         return output_line, 0 # No size added in list_only mode
-    else:
-        try:
-            file_bytes = file_path.read_bytes()
-            actual_file_size = len(file_bytes)
-            # Double check size after reading (important!)
-            if total_size_bytes + actual_file_size > size_limit_bytes:
-                if actual_file_size > size_limit_bytes and total_size_bytes == 0:
-                    logger.warning(f"File {file_path} ({actual_file_size} bytes) exceeds size limit of {size_limit_bytes / (1024*1024):.2f}MB after read. Skipping.")
-                    return None, 0
-                else:
-                    raise ContextSizeExceededError(int(size_limit_bytes / (1024*1024)), total_size_bytes + actual_file_size, file_path)
-
-            content: Optional[str] = None
-            encodings_to_try = ['utf-8', 'latin-1', 'cp1252']
-            for enc in encodings_to_try:
-                try:
-                    content = file_bytes.decode(enc)
-                    if debug_explain: logger.debug(f"Decoded {file_path} using {enc}")
-                    break
-                except UnicodeDecodeError:
-                    continue
-            if content is None:
-                logger.warning(f"Could not decode file {file_path} using {encodings_to_try}. Skipping content.")
-                return None, 0
-
-            # New header format
-            header = f"```path={relative_path_str}"
-            formatted_output = header + "\n" + content + "\n```\n" # Add closing backticks
-            if debug_explain: logger.debug(f"Adding content for: {relative_path_str}")
-            return formatted_output, actual_file_size
-
-        except OSError as e_read:
-            logger.warning(f"Error reading file {file_path}: {e_read}")
-            return None, 0
-        except Exception as e_general:
-            logger.warning(f"Unexpected error processing file {file_path}: {e_general}")
-            return None, 0
\ No newline at end of file
+
+    formatted_output = FILE_BLOCK_TEMPLATE % (relative_path_str, content)
+    if debug_explain: logger.debug(f"Adding content for: {relative_path_str}")
+    return formatted_output, file_size
+
+def process_file(
+    file_path: Path,
+    output_rel_root: Path,
+    size_limit_bytes: int,
+    total_size_bytes: int,
+    list_only: bool,
+    include_size_in_list: bool,
+    debug_explain: bool,
+    skip_binary_check: bool = False
+) -> Tuple[Optional[str], int]:
+    """
+    Processes a single file: checks size, binary status, reads content, formats output.
+
+    Args:
+        file_path: Absolute path to the file to process.
+        output_rel_root: The root directory for calculating relative paths in output.
+        size_limit_bytes: Maximum total context size allowed in bytes.
+        total_size_bytes: Current total size of context processed so far.
+        list_only: If True, only return the relative path (optionally with size).
+        include_size_in_list: If True and list_only is True, prepend size to path.
+        debug_explain: If True, log detailed processing steps.
+        skip_binary_check: If True, skip the binary sniff (see `load_file`).
+
+    Returns:
+        A tuple containing:
+        - The formatted output string (header + content or path string), or None if skipped.
+        - The size of the file content added (0 if skipped or list_only).
+
+    Raises:
+        ContextSizeExceededError: If adding this file would exceed the size limit.
+    """
+    try:
+        loaded = load_file(file_path, size_limit_bytes - total_size_bytes, list_only, debug_explain, skip_binary_check)
+    except Exception as e_general:
+        logger.warning(f"Unexpected error processing file {file_path}: {e_general}")
+        return None, 0
+    if loaded is None:
+        return None, 0
+    file_size, content = loaded
+    return format_file_output(
+        file_path=file_path,
+        file_size=file_size,
+        content=content,
+        output_rel_root=output_rel_root,
+        size_limit_bytes=size_limit_bytes,
+        total_size_bytes=total_size_bytes,
+        list_only=list_only,
+        include_size_in_list=include_size_in_list,
+        debug_explain=debug_explain
+    )
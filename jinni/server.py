@@ -106,6 +106,7 @@ async def read_context(
     list_only: bool = Field(default=False, description="If true, only list discovered files."),
     size_limit_mb: int = Field(default=0, description="Override max size in MB. Use 0 for default."),
     debug_explain: bool = Field(default=False, description="Emit inclusion/exclusion reasoning."),
+    skip_binary_check: bool = Field(default=False, description="If true, treat every included file as text without binary detection (equiv. to --no-binary-check)."),
     # Flattened exclusion parameters (Cursor-safe - no nested objects)
     not_keywords: List[str] = Field(default_factory=list, description="Global exclusions by keyword (equiv. to --not). E.g., ['tests', 'vendor'] excludes test and vendor directories."),
     not_in: List[str] = Field(default_factory=list, description="Scoped exclusions in 'path:kw1,kw2' format (equiv. to --not-in). E.g., ['src:legacy,experimental'] excludes legacy and experimental only within src/."),
@@ -151,6 +152,7 @@ async def read_context(
         list_only: Only list file paths found. Defaults to False.
         size_limit_mb: Override the maximum total context size in MB. Defaults to None (uses core_logic default).
         debug_explain: Print detailed explanation for file/directory inclusion/exclusion to server's stderr. Defaults to False.
+        skip_binary_check: Treat every included file as text without sniffing it. Defaults to False.
     """
     # --- Input Validation ---
     # Use the translated project_root for validation
@@ -304,7 +306,8 @@ async def read_context(
             size_limit_mb=effective_size_limit,
             debug_explain=debug_explain, # Pass flag down
             # include_size_in_list is False by default in core_logic if not passed
-            exclusion_parser=exclusion_parser # Pass exclusion parser for scoped exclusions
+            exclusion_parser=exclusion_parser, # Pass exclusion parser for scoped exclusions
+            skip_binary_check=skip_binary_check
         )
         logger.debug(f"Finished processing project_root: {resolved_project_root_path_str}, targets(s): {resolved_target_paths_str}. Result length: {len(result_content)}")
 
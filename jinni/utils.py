@@ -4,13 +4,14 @@
 import os
 import sys
 import datetime
+import codecs
 import logging
 import mimetypes
 import string
 import platform, subprocess, shutil
 from urllib.parse import urlparse, unquote, quote
 from pathlib import Path, PureWindowsPath
-from typing import List, Tuple, Dict, Optional, Any
+from typing import List, Tuple, Dict, Optional, Any, Iterator
 from functools import lru_cache
 
 # Attempt to import pathspec needed by get_large_files
@@ -27,8 +28,7 @@ except ImportError:
 # but for now, import directly if needed by moved functions.
 # We might need to adjust these imports later during the refactor.
 from .config_system import (
-    compile_spec_from_rules, # Needed by get_large_files
-    DEFAULT_RULES,           # Needed by get_large_files
+    _get_default_spec,       # Needed by get_large_files
     CONTEXT_FILENAME,        # Needed by _find_context_files_for_dir
     GITIGNORE_FILENAME,      # Needed by _find_gitignore_files_for_dir
 )
@@ -224,12 +224,34 @@ def _get_default_wsl_distro() -> str:
 # These might belong in a dedicated constants module later
 BINARY_CHECK_CHUNK_SIZE = 1024
 
-APPLICATION_TEXT_MIMES = {
+APPLICATION_TEXT_MIMES = frozenset({
     'application/json', 'application/xml', 'application/xhtml+xml', 'application/rtf',
     'application/atom+xml', 'application/rss+xml', 'application/x-yaml',
     'application/x-www-form-urlencoded', 'application/javascript', 'application/ecmascript',
     'application/sql', 'application/graphql', 'application/ld+json', 'application/csv',
-}
+})
+# Structured syntax suffixes (RFC 6839) whose payload is always text
+TEXT_MIME_SUFFIXES = ('+xml', '+json')
+
+# Extensions that decide the binary check without touching the disk. Only common,
+# unambiguous extensions belong here; anything else goes through MIME + content sniffing.
+TEXT_EXTENSIONS = frozenset({
+    '.py', '.pyi', '.js', '.mjs', '.cjs', '.jsx', '.ts', '.tsx', '.md', '.rst', '.txt',
+    '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf', '.xml', '.html', '.htm',
+    '.css', '.scss', '.less', '.sh', '.bash', '.zsh', '.ps1', '.bat', '.c', '.h', '.cc',
+    '.cpp', '.hpp', '.cs', '.java', '.kt', '.kts', '.scala', '.go', '.rs', '.rb', '.php',
+    '.swift', '.m', '.lua', '.pl', '.r', '.sql', '.graphql', '.proto', '.vue', '.svelte',
+    '.tf', '.gradle', '.cmake', '.mk', '.csv', '.tsv', '.svg', '.lock',
+})
+# Binary extensions must never name a text format (e.g. .obj is also Wavefront OBJ, .lib a
+# KiCad symbol library), so generic names like .bin, .db or .pdf are left to the sniff.
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.ico', '.tif', '.tiff',
+    '.zip', '.tar', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.jar', '.war', '.whl',
+    '.exe', '.dll', '.so', '.dylib', '.o', '.class', '.pyc', '.pyo',
+    '.wasm', '.sqlite', '.mp3', '.mp4', '.mov', '.avi', '.mkv',
+    '.wav', '.flac', '.ogg', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.psd', '.npy',
+})
 
 # --- Constants for Shared Usage Documentation ---
 ESSENTIAL_USAGE_DOC = """
@@ -302,6 +324,31 @@ When requesting context using the `read_context` tool:
 
 # --- Helper Functions (Moved from core_logic.py) ---
 
+# Output and match paths always use '/'. The separator is fixed per process,
+# so pick the conversion once instead of scanning every path on POSIX.
+if os.sep == '/':
+    def _to_posix_path(path_str: str) -> str:
+        """Returns a native path string with '/' separators (no-op on POSIX)."""
+        return path_str
+else:
+    def _to_posix_path(path_str: str) -> str:
+        """Returns a native path string with '/' separators."""
+        return path_str.replace(os.sep, '/')
+
+def _relative_posix_path(path_str: str, root_str: str) -> Optional[str]:
+    """
+    Returns path_str relative to root_str with '/' separators, by string prefix instead
+    of Path.relative_to. Both must be absolute and normalized (e.g. resolved).
+    Returns '' for the root itself, or None if path_str is not under root_str as spelled
+    (callers wanting Windows' case-insensitive comparison fall back to relative_to).
+    """
+    if path_str == root_str:
+        return ''
+    prefix_len = len(root_str) if root_str.endswith(os.sep) else len(root_str) + 1
+    if len(path_str) <= prefix_len or not path_str.startswith(root_str) or path_str[prefix_len - 1] != os.sep:
+        return None
+    return _to_posix_path(path_str[prefix_len:])
+
 def get_file_info(file_path: Path) -> Dict[str, Any]:
     """Get file information including size and last modified time."""
     try:
@@ -313,92 +360,254 @@ def get_file_info(file_path: Path) -> Dict[str, Any]:
         logger.warning(f"Could not get stats for {file_path}: {e}")
         return {'size': 0, 'last_modified': 'N/A'}
 
-def is_human_readable(filepath: Path, blocksize=BINARY_CHECK_CHUNK_SIZE) -> bool:
+# Unbuffered read-only open flags: no inherited fds, and no CRLF translation on Windows
+_HEAD_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+
+def _read_file_head(file_path: Path, size: int = BINARY_CHECK_CHUNK_SIZE) -> bytes:
+    """
+    Reads up to `size` bytes from the start of a file with raw os.open/os.read,
+    skipping the buffered io object open() would build for a one-off small read.
+    Hints sequential access where supported, since text files are read in full next.
+    Raises OSError like open() would.
+    """
+    fd = os.open(file_path, _HEAD_OPEN_FLAGS)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+def _read_file_bytes(file_path: Path, size_hint: int, max_size: Optional[int] = None) -> bytes:
+    """
+    Reads a whole file with raw os.open/os.read, sized from a prior stat.
+    See `_read_fd_bytes` for `max_size`. Raises OSError like open() would.
+    """
+    fd = os.open(file_path, _HEAD_OPEN_FLAGS)
+    try:
+        return _read_fd_bytes(fd, size_hint, max_size)
+    finally:
+        os.close(fd)
+
+def _read_fd_bytes(fd: int, size_hint: int, max_size: Optional[int] = None) -> bytes:
+    """
+    Reads from fd to EOF. A single read of size_hint + 1 bytes normally returns the
+    whole file and shows EOF was reached; if the file grew since the stat, the rest
+    is read in more calls. With `max_size`, reading stops after max_size + 1 bytes,
+    so a result longer than max_size means the file is larger than that.
+    """
+    data = os.read(fd, size_hint + 1)
+    if len(data) <= size_hint:
+        return data
+    chunks = [data]
+    total = len(data)
+    while max_size is None or total <= max_size:
+        chunk = os.read(fd, 1024 * 1024 if max_size is None else min(1024 * 1024, max_size + 1 - total))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+    return b''.join(chunks)
+
+# Byte tables for counting in C via bytes.translate(None, delete) instead of a per-character loop.
+# Every string.printable character is ASCII, so a character of valid UTF-8 is printable exactly
+# when its single byte is, and the character count is the number of non-continuation bytes.
+_NON_PRINTABLE_BYTES = bytes(b for b in range(256) if chr(b) not in string.printable)
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_Utf8IncrementalDecoder = codecs.getincrementaldecoder('utf-8')
+
+def is_human_readable(filepath: Path, blocksize=BINARY_CHECK_CHUNK_SIZE, chunk: Optional[bytes] = None) -> bool:
     """
     Heuristic check based on printable character ratio in the first block.
     Returns True if the ratio is high (likely text), False otherwise.
+    If `chunk` is given it is used as the first block instead of reading the file.
     """
     try:
-        with open(filepath, 'rb') as file:
-            chunk_bytes = file.read(blocksize)
-            if not chunk_bytes:
-                logger.debug(f"File {filepath} is empty, considered non-readable by heuristic.")
-                return False  # Empty files are not readable
-
-            # Attempt to decode as UTF-8
-            chunk_str = chunk_bytes.decode('utf-8')
-
-            # Count printable characters
-            printable_count = sum(c in string.printable for c in chunk_str)
-            total_len = len(chunk_str)
-            if total_len == 0: # Should not happen if chunk_bytes was not empty, but safety check
-                 logger.debug(f"File {filepath} resulted in zero-length string after decode, considered non-readable.")
-                 return False
-
-            printable_ratio = printable_count / total_len
-            is_readable = printable_ratio > 0.95 # Use user-provided threshold
-            logger.debug(f"File {filepath} printable ratio: {printable_ratio:.3f}. Considered readable: {is_readable}")
-            return is_readable
+        chunk_bytes = chunk[:blocksize] if chunk is not None else _read_file_head(filepath, blocksize)
+        if not chunk_bytes:
+            logger.debug("File %s is empty, considered non-readable by heuristic.", filepath)
+            return False  # Empty files are not readable
+
+        # Count printable characters and total characters on the raw bytes
+        printable_count = len(chunk_bytes.translate(None, _NON_PRINTABLE_BYTES))
+        if chunk_bytes.isascii():
+            # ASCII is valid UTF-8 with one byte per character
+            total_len = len(chunk_bytes)
+        else:
+            # Validate as UTF-8 (raises UnicodeDecodeError otherwise). A full block may end
+            # partway through a multi-byte character, so only a short read is treated as final.
+            _Utf8IncrementalDecoder().decode(chunk_bytes, final=len(chunk_bytes) < blocksize)
+            total_len = len(chunk_bytes.translate(None, _UTF8_CONTINUATION_BYTES))
+        if total_len == 0: # Should not happen if chunk_bytes was not empty, but safety check
+             logger.debug("File %s resulted in zero-length string after decode, considered non-readable.", filepath)
+             return False
+
+        printable_ratio = printable_count / total_len
+        is_readable = printable_ratio > 0.95 # Use user-provided threshold
+        logger.debug("File %s printable ratio: %.3f. Considered readable: %s", filepath, printable_ratio, is_readable)
+        return is_readable
     except UnicodeDecodeError:
-        logger.debug(f"File {filepath} failed UTF-8 decoding. Considered non-readable by heuristic.")
+        logger.debug("File %s failed UTF-8 decoding. Considered non-readable by heuristic.", filepath)
         return False
     except OSError as e:
-        logger.warning(f"Could not read file {filepath} for human-readable check: {e}. Assuming non-readable.")
+        logger.warning("Could not read file %s for human-readable check: %s. Assuming non-readable.", filepath, e)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error during human-readable check for {filepath}: {e}. Assuming non-readable.")
+        logger.error("Unexpected error during human-readable check for %s: %s. Assuming non-readable.", filepath, e)
         return False
 
 
-def _is_binary(file_path: Path) -> bool:
+@lru_cache(maxsize=1024)
+def _guess_mime_type_for_suffixes(suffixes: str) -> Optional[str]:
+    # guess_type only looks at the last suffix, after mapping one suffix alias (.tgz)
+    # and stripping one encoding suffix (.gz), so the last two suffixes decide it.
+    mime_type = mimetypes.guess_type('x' + suffixes)[0]
+    if mime_type:
+        # Custom mime.types entries may carry parameters or odd casing ('Text/Plain; charset=utf-8')
+        mime_type = mime_type.split(';', 1)[0].strip().lower()
+    return mime_type or None
+
+# Binary verdicts keyed by path, stored with the (st_mtime_ns, st_size) they were computed
+# for, so list-then-read flows and a long-running server don't re-sniff unchanged files.
+_BINARY_CACHE: Dict[str, Tuple[int, int, bool]] = {}
+_BINARY_CACHE_MAX_ENTRIES = 65536
+
+def _store_binary_verdict(file_path: Path, file_stat: os.stat_result, is_binary: bool) -> None:
+    if len(_BINARY_CACHE) >= _BINARY_CACHE_MAX_ENTRIES:
+        _BINARY_CACHE.clear() # Crude bound; a full re-sniff is cheap compared to unbounded growth
+    _BINARY_CACHE[os.fspath(file_path)] = (file_stat.st_mtime_ns, file_stat.st_size, is_binary)
+
+def _cached_binary_verdict(file_path: Path, file_stat: os.stat_result) -> Optional[bool]:
+    cached = _BINARY_CACHE.get(os.fspath(file_path))
+    if cached is not None and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+        return cached[2]
+    return None
+
+def _known_binary_status(file_path: Path, file_stat: Optional[os.stat_result] = None) -> Optional[bool]:
+    """
+    Decides whether a file is binary without reading it, if possible: from well-known
+    extensions, a text MIME type, or (given `file_stat`) a cached verdict for this file
+    version. Returns None when the content has to be sniffed.
+    """
+    extension = file_path.suffix.lower()
+    if extension in TEXT_EXTENSIONS:
+        return False
+    if extension in BINARY_EXTENSIONS:
+        return True
+    mime_type = _guess_mime_type_for_suffixes(''.join(file_path.suffixes[-2:]))
+    if mime_type and (mime_type.startswith('text/') or mime_type in APPLICATION_TEXT_MIMES
+                      or mime_type.endswith(TEXT_MIME_SUFFIXES)):
+        logger.debug("File %s identified as TEXT by MIME type: %s", file_path, mime_type)
+        return False
+    if file_stat is not None:
+        return _cached_binary_verdict(file_path, file_stat)
+    return None
+
+def _is_binary(file_path: Path, file_stat: Optional[os.stat_result] = None) -> bool:
+    """
+    Check if a file is likely binary (see `_detect_binary` for the heuristics).
+
+    Results are memoized by (path, st_mtime_ns, st_size), so repeated walks such as
+    list-then-read flows or a long-running server don't re-sniff unchanged files.
+    Pass `file_stat` if the caller has already stat-ed the file.
+    Well-known extensions and text MIME types are answered up front without any I/O.
+    """
+    known = _known_binary_status(file_path, file_stat)
+    if known is not None:
+        return known
+    if file_stat is None:
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return _detect_binary(file_path) # Let detection report the error
+        cached = _cached_binary_verdict(file_path, file_stat)
+        if cached is not None:
+            return cached
+    is_binary = _detect_binary(file_path)
+    _store_binary_verdict(file_path, file_stat, is_binary)
+    return is_binary
+
+def _read_file_bytes_if_text(file_path: Path, file_stat: Optional[os.stat_result], size_hint: int,
+                             max_size: Optional[int] = None) -> Optional[bytes]:
+    """
+    Reads a whole file like `_read_file_bytes`, or returns None if it is binary.
+    When the content has to be sniffed, the sniff and the read share one open file:
+    the head is classified first, so binary files are never read in full.
+    Raises OSError like open() would.
+    """
+    known = _known_binary_status(file_path, file_stat)
+    if known is not None:
+        return None if known else _read_file_bytes(file_path, size_hint, max_size)
+
+    fd = os.open(file_path, _HEAD_OPEN_FLAGS)
+    try:
+        head = os.read(fd, BINARY_CHECK_CHUNK_SIZE)
+        is_binary = _is_binary_content(file_path, head)
+        if file_stat is not None:
+            _store_binary_verdict(file_path, file_stat, is_binary)
+        if is_binary:
+            return None
+        if len(head) < BINARY_CHECK_CHUNK_SIZE:
+            return head # Short read: the head is the whole file
+        # Re-read from the start rather than concatenating head + rest (one less full copy)
+        os.lseek(fd, 0, os.SEEK_SET)
+        return _read_fd_bytes(fd, size_hint, max_size)
+    finally:
+        os.close(fd)
+
+def _detect_binary(file_path: Path) -> bool:
     """
     Check if a file is likely binary.
-    1. Check MIME type: If text/* or in APPLICATION_TEXT_MIMES -> Not Binary (False)
-    2. Fallback (MIME is None or ambiguous):
-        a. Check for null bytes in first chunk -> Binary (True) if found.
-        b. If no null bytes, use is_human_readable heuristic -> Binary (True) if heuristic returns False.
+    1. Check MIME type: If text/*, in APPLICATION_TEXT_MIMES or a +xml/+json type -> Not Binary (False)
+    2. Fallback (MIME is None or ambiguous): sniff the first chunk with `_is_binary_content`.
     """
-    filepath_str = str(file_path)
-    mime_type, encoding = mimetypes.guess_type(filepath_str)
-    logger.debug(f"Checking file type for {file_path}. Guessed MIME: {mime_type}, Encoding: {encoding}")
+    mime_type = _guess_mime_type_for_suffixes(''.join(file_path.suffixes[-2:]))
+    logger.debug("Checking file type for %s. Guessed MIME: %s", file_path, mime_type)
 
     if mime_type:
         # Check primary text types
         if mime_type.startswith('text/'):
-            logger.debug(f"File {file_path} identified as TEXT by MIME type: {mime_type}")
+            logger.debug("File %s identified as TEXT by MIME type: %s", file_path, mime_type)
             return False
         # Check known application text types
-        if mime_type in APPLICATION_TEXT_MIMES:
-            logger.debug(f"File {file_path} identified as TEXT by known application MIME type: {mime_type}")
+        if mime_type in APPLICATION_TEXT_MIMES or mime_type.endswith(TEXT_MIME_SUFFIXES):
+            logger.debug("File %s identified as TEXT by known application MIME type: %s", file_path, mime_type)
             return False
         # MIME is known but not identified as text
-        logger.debug(f"MIME type {mime_type} not identified as text. Falling back to secondary checks.")
+        logger.debug("MIME type %s not identified as text. Falling back to secondary checks.", mime_type)
     else:
         # MIME type could not be guessed
-        logger.debug(f"No MIME type guessed for {file_path}. Falling back to secondary checks.")
+        logger.debug("No MIME type guessed for %s. Falling back to secondary checks.", file_path)
 
     # Fallback checks for None or ambiguous MIME types
     try:
-        with open(file_path, 'rb') as f:
-            chunk = f.read(BINARY_CHECK_CHUNK_SIZE)
-            # Check for null bytes first
-            if b'\x00' in chunk:
-                logger.debug(f"File {file_path} contains null bytes. Considered BINARY.")
-                return True
-            # If no null bytes, use the printable ratio heuristic
-            # Re-call is_human_readable as it handles its own reading/errors
-            is_readable_heuristic = is_human_readable(file_path)
-            if is_readable_heuristic:
-                 logger.debug(f"File {file_path} considered TEXT by heuristic fallback (no null bytes).")
-                 return False # Heuristic says it's readable -> Not Binary
-            else:
-                 logger.debug(f"File {file_path} considered BINARY by heuristic fallback (no null bytes).")
-                 return True # Heuristic says it's not readable -> Binary
+        chunk = _read_file_head(file_path)
     except OSError as e:
-         logger.warning(f"Could not read file {file_path} for fallback binary check: {e}. Assuming TEXT (safer default).")
+         logger.warning("Could not read file %s for fallback binary check: %s. Assuming TEXT (safer default).", file_path, e)
          return False # Default to False (text) on read error during fallback
+    return _is_binary_content(file_path, chunk)
+
+def _is_binary_content(file_path: Path, chunk: bytes) -> bool:
+    """
+    Content sniff on the first chunk of a file:
+        a. Check for null bytes -> Binary (True) if found.
+        b. If no null bytes, use is_human_readable heuristic -> Binary (True) if heuristic returns False.
+    """
+    try:
+        # Check for null bytes first
+        if b'\x00' in chunk:
+            logger.debug("File %s contains null bytes. Considered BINARY.", file_path)
+            return True
+        # If no null bytes, use the printable ratio heuristic on the same chunk
+        is_readable_heuristic = is_human_readable(file_path, chunk=chunk)
+        if is_readable_heuristic:
+             logger.debug("File %s considered TEXT by heuristic fallback (no null bytes).", file_path)
+             return False # Heuristic says it's readable -> Not Binary
+        else:
+             logger.debug("File %s considered BINARY by heuristic fallback (no null bytes).", file_path)
+             return True # Heuristic says it's not readable -> Binary
     except Exception as e:
-         logger.error(f"Unexpected error during fallback binary check for {file_path}: {e}. Assuming TEXT.")
+         logger.error("Unexpected error during fallback binary check for %s: %s. Assuming TEXT.", file_path, e)
          return False # Default to False (text) on unexpected error
 
 
@@ -406,6 +615,45 @@ def _is_binary(file_path: Path) -> bool:
 # The CLI and Server now use hardcoded essential usage info.
 
 
+def _scandir_walk(top: str) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
+    """
+    Top-down walk equivalent to os.walk(top, followlinks=False), but yielding the
+    os.DirEntry objects so callers can use their cached type and stat information
+    instead of rebuilding paths and stat-ing them again.
+
+    Yields (dirpath, dir_entries, file_entries), each list sorted by name. As with
+    os.walk, entries that are directories (including symlinks to directories) go in
+    dir_entries and everything else in file_entries. The caller may prune dir_entries
+    in place to stop descent; symlinked directories are never descended into.
+    Unreadable directories are skipped, like os.walk without onerror.
+    """
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.debug("Could not scan directory %s: %s", dirpath, e)
+            continue
+
+        dir_entries: List[os.DirEntry] = []
+        file_entries: List[os.DirEntry] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            (dir_entries if is_dir else file_entries).append(entry)
+
+        yield dirpath, dir_entries, file_entries
+
+        # Push in reverse so subdirectories are visited in sorted order
+        for entry in reversed(dir_entries):
+            if not entry.is_symlink():
+                stack.append(entry.path)
+
+
 def get_large_files(root_dir_str: str = ".", top_n: int = 10) -> List[Tuple[str, int]]:
     """
     Finds the largest files in the project directory, ignoring .git and applying default rules.
@@ -425,108 +673,80 @@ def get_large_files(root_dir_str: str = ".", top_n: int = 10) -> List[Tuple[str,
     logger.info(f"Scanning for large files under: {root_dir}")
     file_sizes = []
     # Compile default spec to ignore common patterns like .git
-    default_spec = compile_spec_from_rules(DEFAULT_RULES, "Defaults")
-
-    for dirpath_str, dirnames, filenames in os.walk(root_dir, topdown=True, followlinks=False):
-        current_dir_path = Path(dirpath_str).resolve()
-
-        # Prune based on default rules
-        dirnames_to_remove = []
-        for dirname in dirnames:
-            sub_dir_path = (current_dir_path / dirname).resolve()
+    default_spec = _get_default_spec()
+
+    root_dir_str = str(root_dir)
+    root_prefix_len = len(root_dir_str) if root_dir_str.endswith(os.sep) else len(root_dir_str) + 1
+    for dirpath_str, dir_entries, file_entries in _scandir_walk(root_dir_str):
+        rel_dir = _to_posix_path(dirpath_str[root_prefix_len:]) if dirpath_str != root_dir_str else ''
+        match_prefix = rel_dir + '/' if rel_dir else ''
+        # Prune based on default rules, collecting survivors in one pass
+        kept_dir_entries = []
+        for dir_entry in dir_entries:
+            if dir_entry.is_symlink():
+                continue # Never descended into
             try:
-                path_for_match = str(sub_dir_path.relative_to(root_dir)).replace(os.sep, '/') + '/'
-                if not default_spec.match_file(path_for_match):
-                    dirnames_to_remove.append(dirname)
-            except ValueError:
-                pass # Cannot make relative, likely outside root_dir somehow? Skip check.
+                if not default_spec.match_file(match_prefix + dir_entry.name + '/'):
+                    continue
             except Exception as e_prune:
-                 logger.warning(f"Error checking directory {sub_dir_path} against default spec: {e_prune}")
+                 logger.warning(f"Error checking directory {dir_entry.path} against default spec: {e_prune}")
+            kept_dir_entries.append(dir_entry)
 
-        if dirnames_to_remove:
-            dirnames[:] = [d for d in dirnames if d not in dirnames_to_remove]
+        dir_entries[:] = kept_dir_entries
 
-        # Check files
-        for filename in filenames:
-            file_path = (current_dir_path / filename).resolve()
+        # Check files (regular files only, symlinks are skipped)
+        for file_entry in file_entries:
+            if not file_entry.is_file(follow_symlinks=False):
+                continue
+            path_for_match = match_prefix + file_entry.name
             try:
-                path_for_match = str(file_path.relative_to(root_dir)).replace(os.sep, '/')
                 if default_spec.match_file(path_for_match):
-                    if file_path.is_file() and not file_path.is_symlink():
-                        try:
-                            size = file_path.stat().st_size
-                            relative_path_str = str(file_path.relative_to(root_dir)).replace(os.sep, '/')
-                            file_sizes.append((relative_path_str, size))
-                        except OSError as e_stat:
-                            logger.debug(f"Could not stat file {file_path}: {e_stat}")
-            except ValueError:
-                 pass # Cannot make relative, skip check.
+                    try:
+                        size = file_entry.stat(follow_symlinks=False).st_size
+                        file_sizes.append((path_for_match, size))
+                    except OSError as e_stat:
+                        logger.debug(f"Could not stat file {file_entry.path}: {e_stat}")
             except Exception as e_match:
-                 logger.warning(f"Error checking file {file_path} against default spec: {e_match}")
+                 logger.warning(f"Error checking file {file_entry.path} against default spec: {e_match}")
 
 
     # Sort by size descending and return top N
     file_sizes.sort(key=lambda item: item[1], reverse=True)
     return file_sizes[:top_n]
 
-def _find_context_files_for_dir(dir_path: Path, root_path: Path) -> List[Path]:
-    """Finds all .contextfiles from root_path down to dir_path."""
-    context_files = []
-    current = dir_path.resolve()
-    root = root_path.resolve()
-
-    # Ensure dir_path is within or at root_path
-    if not (current == root or root in current.parents):
-         logger.warning(f"Directory {current} is not within the root {root}. Cannot find context files.")
-         return []
+def _find_rule_files_for_dir(dir_path: Path, root_path: Path, filename: str) -> List[Path]:
+    """Finds all files named `filename` from root_path down to dir_path, root first."""
+    current = os.fspath(dir_path.resolve())
+    root = os.fspath(root_path.resolve())
 
-    # Walk upwards from dir_path to root, collecting paths
-    paths_to_check = []
+    # Walk upwards from dir_path to root on plain strings, collecting directories
+    dirs_to_check = [current]
     temp_path = current
-    while temp_path >= root:
-        paths_to_check.append(temp_path)
-        if temp_path == root: break
-        parent = temp_path.parent
-        if parent == temp_path: break # Should not happen with pathlib resolve
+    while temp_path != root:
+        parent = os.path.dirname(temp_path)
+        if parent == temp_path:
+            # Reached the filesystem root without meeting root_path
+            logger.warning(f"Directory {current} is not within the root {root}. Cannot find {filename} files.")
+            return []
+        dirs_to_check.append(parent)
         temp_path = parent
 
-    # Reverse the list so it's root-down, and check for .contextfile
-    for p in reversed(paths_to_check):
-        context_file = p / CONTEXT_FILENAME
-        if context_file.is_file():
-            context_files.append(context_file)
-            logger.debug(f"Found context file: {context_file}")
+    # Check root-down for the rule file
+    found = []
+    for d in reversed(dirs_to_check):
+        rule_file = os.path.join(d, filename)
+        if os.path.isfile(rule_file):
+            found.append(Path(rule_file))
+            logger.debug(f"Found {filename} file: {rule_file}")
+    return found
 
-    return context_files
+def _find_context_files_for_dir(dir_path: Path, root_path: Path) -> List[Path]:
+    """Finds all .contextfiles from root_path down to dir_path."""
+    return _find_rule_files_for_dir(dir_path, root_path, CONTEXT_FILENAME)
 
 def _find_gitignore_files_for_dir(dir_path: Path, root_path: Path) -> List[Path]:
     """Finds all .gitignore files from root_path down to dir_path."""
-    gitignore_files = []
-    current = dir_path.resolve()
-    root = root_path.resolve()
-
-    if not (current == root or root in current.parents):
-         logger.warning(f"Directory {current} is not within the root {root}. Cannot find gitignore files.")
-         return []
-
-    paths_to_check = []
-    temp_path = current
-    while temp_path >= root:
-        paths_to_check.append(temp_path)
-        if temp_path == root:
-            break
-        parent = temp_path.parent
-        if parent == temp_path:
-            break
-        temp_path = parent
-
-    for p in reversed(paths_to_check):
-        ignore_file = p / GITIGNORE_FILENAME
-        if ignore_file.is_file():
-            gitignore_files.append(ignore_file)
-            logger.debug(f"Found gitignore file: {ignore_file}")
-
-    return gitignore_files
+    return _find_rule_files_for_dir(dir_path, root_path, GITIGNORE_FILENAME)
 
 # --- WSL Path Translation Helper ---
 
@@ -8,6 +8,8 @@ import pathspec # Direct import, assume it's installed
 from jinni.config_system import (
     load_rules_from_file,
     compile_spec_from_rules,
+    compile_extension_prefilter,
+    compile_directory_file_matcher,
     load_gitignore_as_context_rules,
     DEFAULT_RULES,  # Import to potentially check its content or use in tests
     CONTEXT_FILENAME,
@@ -51,6 +53,34 @@ def test_load_rules_read_error(tmp_path: Path, monkeypatch):
     rules = load_rules_from_file(rule_file)
     assert rules == [] # Should return empty list on error
 
+def test_load_rules_cache_invalidated_on_change(tmp_path: Path, monkeypatch):
+    """Test cached rule files are reused until the file changes."""
+    rule_file = tmp_path / "cached.rules"
+    rule_file.write_text("*.py", encoding='utf-8')
+    assert load_rules_from_file(rule_file) == ["*.py"]
+
+    # An unchanged file must not be read again
+    original_read_text = Path.read_text
+    def fail_read_text(*args, **kwargs):
+        raise AssertionError("rule file re-read while unchanged")
+    monkeypatch.setattr(Path, "read_text", fail_read_text)
+    assert load_rules_from_file(rule_file) == ["*.py"]
+
+    monkeypatch.setattr(Path, "read_text", original_read_text)
+    rule_file.write_text("*.py\n!tests/", encoding='utf-8')
+    assert load_rules_from_file(rule_file) == ["*.py", "!tests/"]
+
+def test_load_rules_cache_is_bounded(tmp_path: Path, monkeypatch):
+    """Test the rule file cache is cleared rather than growing past its bound."""
+    import jinni.config_system as config_system
+    monkeypatch.setattr(config_system, "_RULE_FILE_CACHE", {})
+    monkeypatch.setattr(config_system, "_RULE_FILE_CACHE_MAX_ENTRIES", 2)
+    for i in range(5):
+        rule_file = tmp_path / f"bounded_{i}.rules"
+        rule_file.write_text(f"*.ext{i}", encoding='utf-8')
+        assert load_rules_from_file(rule_file) == [f"*.ext{i}"]
+        assert len(config_system._RULE_FILE_CACHE) <= 2
+
 # --- Tests for compile_spec_from_rules ---
 
 def test_compile_empty_list():
@@ -129,6 +159,44 @@ def test_default_rules_compilation():
     # Check something not excluded by default
     assert spec.match_file("src/main.py") # Defaults include '*' first, so this should be included
 
+def test_compile_spec_is_memoized():
+    """Test identical rule lists reuse the same compiled spec."""
+    spec_a = compile_spec_from_rules(["*.py", "!tests/"], "First")
+    spec_b = compile_spec_from_rules(["*.py", "!tests/"], "Second")
+    spec_c = compile_spec_from_rules(["*.py"], "Different")
+    assert spec_a is spec_b
+    assert spec_a is not spec_c
+    assert spec_b._original_rules == ["*.py", "!tests/"]
+
+def test_extension_prefilter_uses_trailing_rules_only():
+    """Test the extension prefilter only covers trailing '*.ext' rules, last rule winning."""
+    rules = ["*", "!*.md", "src/", "*.py", "# comment", "!*.pyc", "*.pyc", "!*.log"]
+    decisions = compile_extension_prefilter(rules)
+    assert decisions == {"py": True, "pyc": True, "log": False}
+    # 'md' is shadowed by the later 'src/' rule, so it must go through the full spec
+    assert "md" not in decisions
+    spec = compile_spec_from_rules(rules)
+    for name, included in decisions.items():
+        assert spec.match_file(f"dir/file.{name}") == included
+
+def test_extension_prefilter_empty_when_last_rule_is_not_extension():
+    """Test no extension shortcut is offered when the last rule is a general pattern."""
+    assert compile_extension_prefilter(DEFAULT_RULES) == {}
+
+def test_directory_file_matcher_agrees_with_spec():
+    """Test the per-directory matcher gives the same answers as PathSpec.match_file."""
+    rules = DEFAULT_RULES + ["src/", "!src/gen/", "!tests/", "docs/*.md", "**/deep/", "!*.md", "build/keep.txt",
+                             "!**/*gen*/**", "src/gen/keep/**", "!docs/**", "*.md"]
+    spec = compile_spec_from_rules(rules)
+    directories = ["", "src", "src/gen", "src/gen/deep", "src/gen/keep", "src/gen/keep/x", "tests", "docs", "docs/api",
+                   "build", "a/node_modules/b", "x/deep/y", "x/regenerate/y"]
+    files = ["main.py", "README.md", "keep.txt", "app.log", "LICENSE", "mod.pyc", ".env"]
+    for directory in directories:
+        prefix = directory + "/" if directory else ""
+        match_in_dir = compile_directory_file_matcher(spec, prefix)
+        for name in files:
+            assert match_in_dir(prefix + name) == spec.match_file(prefix + name), prefix + name
+
 
 def test_load_gitignore_as_context_rules_spaces_and_comments(tmp_path: Path):
     """Ensure gitignore lines are converted with spaces preserved and comments ignored."""
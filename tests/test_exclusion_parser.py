@@ -164,6 +164,21 @@ class TestExclusionParser:
         patterns = parser.get_scoped_patterns(Path("/project/docs"), walk_root)
         assert len(patterns) == 0
     
+    def test_get_scoped_patterns_memoized_per_directory(self):
+        """Test scoped patterns are computed once per directory and follow reassigned scopes."""
+        parser = ExclusionParser()
+        parser.combine_exclusions(not_in_scoped=["src:legacy"])
+        walk_root = Path("/project")
+
+        first = parser.get_scoped_patterns(Path("/project/src/a"), walk_root)
+        assert parser.get_scoped_patterns(Path("/project/src/a"), walk_root) is first
+        assert "!src/legacy/**" in first
+
+        # Replacing the scopes (as the server does) drops the memoized results
+        parser.scoped_exclusions = parser.parse_not_in(["lib:old"])
+        assert parser.get_scoped_patterns(Path("/project/src/a"), walk_root) == []
+        assert "!lib/old/**" in parser.get_scoped_patterns(Path("/project/lib"), walk_root)
+    
     def test_create_exclusion_patterns_function(self):
         """Test the convenience function."""
         patterns, parser = create_exclusion_patterns(
@@ -85,6 +85,17 @@ def test_cli_list_only(test_environment: Path):
     assert actual_files == expected_files, f"Expected {expected_files}, got {actual_files}"
     assert stderr.strip() == ""
 
+def test_cli_no_binary_check(test_environment: Path):
+    """Test --no-binary-check lists files the binary sniff would otherwise drop."""
+    test_dir = test_environment
+    (test_dir / "blob.unknownext").write_bytes(b"\x00\x01\x02 not text")
+
+    stdout, stderr = run_jinni_cli(["-r", str(test_dir), "--list-only", "--no-copy"])
+    assert "blob.unknownext" not in stdout.splitlines()
+    stdout, stderr = run_jinni_cli(["-r", str(test_dir), "--list-only", "--no-binary-check", "--no-copy"])
+    assert "blob.unknownext" in stdout.splitlines()
+    assert "main.py" in stdout.splitlines()
+
 def test_cli_overrides(test_environment: Path): # Renamed from test_cli_global_config
     """Test the --overrides CLI flag."""
     test_dir = test_environment
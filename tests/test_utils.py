@@ -10,7 +10,8 @@ from jinni.core_logic import read_context # Keep for run_read_context_helper
 from jinni.exceptions import ContextSizeExceededError, DetailedContextSizeError # Moved exceptions
 from jinni.utils import _find_context_files_for_dir # Moved helper
 from jinni.config_system import CONTEXT_FILENAME, DEFAULT_RULES # Import constants
-from jinni.utils import ensure_no_nul
+from jinni.file_processor import load_file
+from jinni.utils import ensure_no_nul, _is_binary, is_human_readable, get_large_files, _read_file_bytes, _read_file_bytes_if_text, _relative_posix_path
 # SEPARATOR is not directly used/tested here
 
 # --- Test Fixture ---
@@ -260,6 +261,35 @@ def test_read_context_size_limit_exceeded(test_dir: Path):
     with pytest.raises(DetailedContextSizeError):
         run_read_context_helper("project", test_dir.parent, size_limit_mb=limit_mb) # Root is project, target is None
 
+def test_read_context_size_limit_file_targets(tmp_path: Path):
+    """Explicit file targets are budgeted like walked files: a lone oversize file is skipped, overflow raises."""
+    root = tmp_path / "targets"
+    root.mkdir()
+    (root / "big.txt").write_text("x" * 2000, encoding='utf-8')
+    (root / "a.txt").write_text("a" * 600, encoding='utf-8')
+    (root / "b.txt").write_text("b" * 600, encoding='utf-8')
+    limit_mb = 0.001 # ~1048 bytes
+
+    content = read_context([str(root / "big.txt"), str(root / "a.txt")], str(root), size_limit_mb=limit_mb)
+    assert "```path=a.txt" in content
+    assert "big.txt" not in content
+    with pytest.raises(DetailedContextSizeError) as excinfo:
+        read_context([str(root / "a.txt"), str(root / "b.txt")], str(root), size_limit_mb=limit_mb)
+    assert str(root / "b.txt") in str(excinfo.value)
+
+def test_read_context_reserved_budget_released_by_binary_file(tmp_path: Path):
+    """A file passed over while an earlier load held the budget is still read if it fits."""
+    root = tmp_path / "reserved"
+    root.mkdir()
+    (root / CONTEXT_FILENAME).write_text("*", encoding='utf-8')
+    (root / "a.unknownext").write_bytes(b"\x00" * 600) # Reserves budget, then sniffs as binary
+    (root / "b.txt").write_text("b" * 600, encoding='utf-8')
+
+    content = run_read_context_helper("reserved", tmp_path, size_limit_mb=0.001) # ~1048 bytes
+    assert "```path=b.txt" in content
+    assert "b" * 600 in content
+    assert "a.unknownext" not in content
+
 def test_read_context_target_file(test_dir: Path):
     """Test processing a specific target file within the project root."""
     (test_dir / CONTEXT_FILENAME).write_text("!**/*.py", encoding='utf-8') # Exclude all py
@@ -296,6 +326,107 @@ def test_read_context_target_dir(test_dir: Path):
     assert "```path=main.py" not in content
     assert "```path=README.md" not in content
 
+def test_read_context_many_files_ordered(tmp_path: Path):
+    """Test files read concurrently within one directory are emitted in sorted order."""
+    root = tmp_path / "many"
+    root.mkdir()
+    for i in range(50):
+        (root / f"file_{i:02d}.txt").write_text(f"content {i}", encoding='utf-8')
+
+    content = run_read_context_helper("many", tmp_path)
+    positions = [content.index(f"```path=file_{i:02d}.txt") for i in range(50)]
+    assert positions == sorted(positions)
+    assert "content 49" in content
+
+def test_read_context_read_ahead_across_directories(tmp_path: Path):
+    """Test reads queued across directories keep walk order and stop at the same file."""
+    root = tmp_path / "tree"
+    for d in range(4):
+        (root / f"dir_{d}").mkdir(parents=True)
+        for i in range(60):
+            (root / f"dir_{d}" / f"file_{i:02d}.txt").write_text("x" * 10240, encoding='utf-8')
+
+    listed = run_read_context_helper("tree", tmp_path, list_only=True).splitlines()
+    assert listed == [f"dir_{d}/file_{i:02d}.txt" for d in range(4) for i in range(60)]
+
+    # 1MB holds 102 files of 10KB: the 103rd in walk order trips the limit
+    with pytest.raises(DetailedContextSizeError) as excinfo:
+        run_read_context_helper("tree", tmp_path, size_limit_mb=1)
+    assert str(root / "dir_1" / "file_42.txt") in str(excinfo.value)
+
+def test_read_context_read_ahead_bytes_bounded_by_size_limit(tmp_path: Path, monkeypatch):
+    """Test queued reads don't read past the size limit when the files can't all fit."""
+    root = tmp_path / "large"
+    root.mkdir()
+    for i in range(20):
+        (root / f"file_{i:02d}.txt").write_text("x" * 50000, encoding='utf-8')
+
+    bytes_read = []
+    original_read = os.read
+    monkeypatch.setattr(os, "read", lambda fd, n: bytes_read.append(n) or original_read(fd, n))
+    with pytest.raises(DetailedContextSizeError):
+        run_read_context_helper("large", tmp_path, size_limit_mb=0.08) # ~84KB: one file fits, two don't
+    # Only the first file is read; the others would overflow the limit
+    assert sum(bytes_read) <= 50001
+
+def test_read_context_list_only_skip_binary_check(test_dir: Path):
+    """Test skip_binary_check lists files the binary sniff would otherwise drop."""
+    (test_dir / CONTEXT_FILENAME).write_text("*", encoding='utf-8') # Include everything
+    default_list = run_read_context_helper("project", test_dir.parent, list_only=True)
+    assert "image.jpg" not in default_list.splitlines()
+
+    unchecked_list = read_context(
+        [str(test_dir)], str(test_dir), list_only=True, skip_binary_check=True
+    ).splitlines()
+    assert "image.jpg" in unchecked_list
+    assert "main.py" in unchecked_list
+
+def test_read_context_reuses_parent_rules_for_directories_without_rule_files(tmp_path: Path, monkeypatch):
+    """Directories that add no rule files reuse their parent's rules instead of reloading them."""
+    import jinni.context_walker as context_walker
+    root = tmp_path / "nested"
+    (root / "a" / "b" / "c").mkdir(parents=True)
+    (root / CONTEXT_FILENAME).write_text("!*.log", encoding='utf-8')
+    (root / "a" / "b" / CONTEXT_FILENAME).write_text("!skip.txt", encoding='utf-8')
+    for directory in (root, root / "a", root / "a" / "b", root / "a" / "b" / "c"):
+        (directory / "keep.txt").write_text("keep", encoding='utf-8')
+        (directory / "skip.txt").write_text("skip", encoding='utf-8')
+        (directory / "app.log").write_text("log", encoding='utf-8')
+
+    loaded = []
+    original_load = context_walker.load_rules_from_file
+    monkeypatch.setattr(context_walker, "load_rules_from_file", lambda path: loaded.append(path) or original_load(path))
+    listed = run_read_context_helper("nested", tmp_path, list_only=True).splitlines()
+
+    assert sorted(listed) == sorted(["keep.txt", "skip.txt", "a/keep.txt", "a/skip.txt", "a/b/keep.txt", "a/b/c/keep.txt"])
+    # Rules are loaded at the root and at a/b, the only directories adding a rule file
+    assert loaded == [root / CONTEXT_FILENAME, root / CONTEXT_FILENAME, root / "a" / "b" / CONTEXT_FILENAME]
+
+def test_read_context_list_only_skips_file_over_size_limit(tmp_path: Path):
+    """Test list_only skips a lone file over the size limit, with or without sizes shown."""
+    root = tmp_path / "listing"
+    root.mkdir()
+    (root / "big.txt").write_text("x" * 3000, encoding='utf-8')
+    (root / "small.py").write_text("print('hi')", encoding='utf-8')
+
+    listed = run_read_context_helper("listing", tmp_path, list_only=True, size_limit_mb=0.001) # ~1048 bytes
+    assert listed.splitlines() == ["small.py"]
+    sized = run_read_context_helper("listing", tmp_path, list_only=True, size_limit_mb=0.001, include_size_in_list=True)
+    assert sized.splitlines() == ["11\tsmall.py"]
+
+def test_read_context_decodes_cp1252(tmp_path: Path):
+    """Test non-UTF-8 text falls back to cp1252, replacing bytes it leaves undefined."""
+    root = tmp_path / "enc"
+    root.mkdir()
+    (root / "quotes.txt").write_bytes("\u201cquoted\u201d caf\u00e9".encode('cp1252'))
+    (root / "plain.txt").write_bytes(b"plain ascii")
+    (root / "undefined.txt").write_bytes(b"na\xefve \x81 byte")
+
+    content = run_read_context_helper("enc", tmp_path)
+    assert "\u201cquoted\u201d caf\u00e9" in content
+    assert "plain ascii" in content
+    assert "na\u00efve \ufffd byte" in content
+
 # Test removed as core logic now handles a single effective target path
 # def test_read_context_multiple_targets(test_dir: Path):
 
@@ -441,4 +572,135 @@ def test_ensure_no_nul_utils():
     # Should raise ValueError on NUL
     import pytest
     with pytest.raises(ValueError):
-        ensure_no_nul("a\x00b", "test-field")
\ No newline at end of file
+        ensure_no_nul("a\x00b", "test-field")
+
+def test_is_binary_cached_until_file_changes(tmp_path: Path, monkeypatch):
+    """_is_binary reuses its verdict for an unchanged file and re-checks a modified one."""
+    import jinni.utils as utils_module
+    file_path = tmp_path / "blob.unknownext"
+    file_path.write_bytes(b"plain text content")
+    assert _is_binary(file_path) is False
+
+    calls = []
+    original_detect = utils_module._detect_binary
+    monkeypatch.setattr(utils_module, "_detect_binary", lambda p: calls.append(p) or original_detect(p))
+    assert _is_binary(file_path) is False
+    assert calls == []
+
+    file_path.write_bytes(b"now with a null\x00 byte")
+    assert _is_binary(file_path) is True
+    assert len(calls) == 1
+
+def test_is_human_readable_uses_given_chunk(tmp_path: Path):
+    """is_human_readable classifies a supplied chunk without reading the file."""
+    missing = tmp_path / "does_not_exist"
+    assert is_human_readable(missing, chunk=b"def main():\n    return 0\n") is True
+    assert is_human_readable(missing, chunk=b"\x01\x02\x03\x04 mostly control") is False
+    assert is_human_readable(missing, chunk=b"") is False
+
+def test_is_binary_extension_fast_path(tmp_path: Path):
+    """Known extensions decide the binary check without reading the file."""
+    assert _is_binary(tmp_path / "missing.py") is False
+    assert _is_binary(tmp_path / "missing.png") is True
+    # Content is not consulted for a known extension
+    disguised = tmp_path / "notes.png"
+    disguised.write_text("just text", encoding='utf-8')
+    assert _is_binary(disguised) is True
+    # Extensions shared with text formats are sniffed
+    model = tmp_path / "model.obj"
+    model.write_text("v 0.0 0.0 0.0\nv 1.0 0.0 0.0\nf 1 2 1\n", encoding='utf-8')
+    assert _is_binary(model) is False
+    model.write_bytes(b"\x4c\x01\x00\x00" * 8) # COFF object file
+    assert _is_binary(model) is True
+
+def test_get_large_files_skips_symlinks_and_excluded_dirs(tmp_path: Path):
+    """get_large_files sizes regular files only and honours default exclusions."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "big.py").write_text("x" * 500, encoding='utf-8')
+    (tmp_path / "small.txt").write_text("y" * 10, encoding='utf-8')
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "huge.js").write_text("z" * 5000, encoding='utf-8')
+    try:
+        os.symlink(tmp_path / "src" / "big.py", tmp_path / "big_link.py")
+    except (OSError, NotImplementedError):
+        pass # Symlinks unavailable; the rest of the test still applies
+    assert get_large_files(str(tmp_path)) == [("src/big.py", 500), ("small.txt", 10)]
+
+def test_is_human_readable_allows_character_split_at_block_end(tmp_path: Path):
+    """A multi-byte UTF-8 character cut off by the block boundary does not make a file binary."""
+    text = "a" * 1023 + "é and more text"
+    assert is_human_readable(tmp_path / "unused", chunk=text.encode('utf-8')) is True
+    # A short read is the whole file, so a truncated character there is invalid
+    assert is_human_readable(tmp_path / "unused", chunk=b"abc\xc3") is False
+
+@pytest.fixture
+def isolated_binary_caches():
+    """Clears the MIME-guess and binary-verdict caches before and after a test."""
+    from jinni.utils import _guess_mime_type_for_suffixes, _BINARY_CACHE
+    _guess_mime_type_for_suffixes.cache_clear()
+    _BINARY_CACHE.clear()
+    yield
+    _guess_mime_type_for_suffixes.cache_clear()
+    _BINARY_CACHE.clear()
+
+def test_is_binary_structured_text_mime_suffix(tmp_path: Path, monkeypatch, isolated_binary_caches):
+    """+json/+xml MIME types are text without a content sniff, even with parameters."""
+    import mimetypes
+    custom_types = {".jinnitestjson": "application/vnd.jinni-test+json", ".jinnitestparam": "Application/JSON; charset=utf-8"}
+    original_guess_type = mimetypes.guess_type
+    def guess_type(url, strict=True):
+        suffix = os.path.splitext(url)[1]
+        return (custom_types[suffix], None) if suffix in custom_types else original_guess_type(url, strict)
+    monkeypatch.setattr(mimetypes, "guess_type", guess_type) # Leaves the global registry untouched
+
+    structured = tmp_path / "data.jinnitestjson"
+    structured.write_bytes(b"\x00 not sniffed")
+    assert _is_binary(structured) is False
+    with_params = tmp_path / "data.jinnitestparam"
+    with_params.write_bytes(b"\x00 not sniffed either")
+    assert _is_binary(with_params) is False
+
+def test_read_file_bytes_ignores_stale_size_hint(tmp_path: Path):
+    """_read_file_bytes returns the whole file even if it changed size since the stat."""
+    file_path = tmp_path / "grown.txt"
+    file_path.write_bytes(b"0123456789" * 1000)
+    assert _read_file_bytes(file_path, 3) == b"0123456789" * 1000
+    assert _read_file_bytes(file_path, 10000) == b"0123456789" * 1000
+    assert _read_file_bytes(file_path, 50000) == b"0123456789" * 1000
+    # Capped reads stop one byte past max_size however stale the hint is
+    assert _read_file_bytes(file_path, 3, max_size=100) == (b"0123456789" * 11)[:101]
+    assert _read_file_bytes(file_path, 10000, max_size=20000) == b"0123456789" * 1000
+
+def test_read_file_bytes_if_text_sniffs_and_reads_with_one_open(tmp_path: Path, monkeypatch):
+    """Files that need a content sniff are sniffed and read through a single open."""
+    text_file = tmp_path / "notes.unknownext"
+    text_file.write_bytes(b"line of text\n" * 500)
+    binary_file = tmp_path / "blob.unknownext"
+    binary_file.write_bytes(b"header\x00" + b"\xff" * 5000)
+
+    opened = []
+    original_open = os.open
+    monkeypatch.setattr(os, "open", lambda path, *args, **kwargs: opened.append(path) or original_open(path, *args, **kwargs))
+    text_stat = os.stat(text_file)
+    assert _read_file_bytes_if_text(text_file, text_stat, text_stat.st_size) == b"line of text\n" * 500
+    assert opened == [text_file]
+    binary_stat = os.stat(binary_file)
+    assert _read_file_bytes_if_text(binary_file, binary_stat, binary_stat.st_size) is None
+
+    # The verdicts are cached for the unchanged files
+    opened.clear()
+    assert _is_binary(text_file, text_stat) is False
+    assert _is_binary(binary_file, binary_stat) is True
+    assert opened == []
+
+def test_relative_posix_path_by_string_prefix(tmp_path: Path):
+    """Relative paths come from the root's string prefix and agree with Path.relative_to."""
+    root = tmp_path / "project"
+    nested = root / "src" / "pkg" / "mod.py"
+    assert _relative_posix_path(str(nested), str(root)) == nested.relative_to(root).as_posix()
+    assert _relative_posix_path(str(root), str(root)) == ""
+    # A sibling sharing the root's name as a prefix is not under it
+    assert _relative_posix_path(str(tmp_path / "project-old" / "a.py"), str(root)) is None
+    assert _relative_posix_path(str(tmp_path), str(root)) is None
+    anchor = Path(nested.anchor)
+    assert _relative_posix_path(str(nested), str(anchor)) == nested.relative_to(anchor).as_posix()